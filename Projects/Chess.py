@@ -1,7 +1,20 @@
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
+
+from chess_engine import Position, COLORS, LETTERS, PROMOTIONS, row_col
+from chess_book import OpeningBook
+from chess_pgn import PGNError, read_games, replay, write_pgn
+from chess_search import Engine
+from chess_tablebase import Tablebase
 
 BOARD_SIZE = 8
+AI_TIME_LIMIT = 1.0  # seconds per computer move
+# build one with: python chess_book.py build games.pgn book.bin
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
 
 pieces =   {
     "K": "♔", "Q": "♕", "R": "♖", "B": "♗", "N": "♘", "P": "♙",
@@ -19,23 +32,94 @@ initial_board = [
                     ["R" , "N" , "B" , "Q" , "K" , "B" , "N" , "R" ],
                 ]
 
+class EngineWorker:
+    """Runs engine jobs on a background thread so the Tk loop never waits on them.
+
+    A job is a function taking a threading.Event that is set when the job is
+    cancelled. Results are handed back through a queue polled with root.after
+    and passed to the job's callback on the Tk thread. Submitting a job cancels
+    any earlier job of the same kind, and cancelled results are dropped.
+    """
+
+    def __init__(self, root, poll_ms=20, on_error=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_error = on_error  # called on the Tk thread with the exception a job raised
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.current = {}  # kind -> stop event of the newest job of that kind
+        threading.Thread(target=self._run, daemon=True).start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, kind, job, callback):
+        self.cancel(kind)
+        stop = threading.Event()
+        self.current[kind] = stop
+        self.jobs.put((kind, stop, job, callback))
+
+    def cancel(self, kind=None):
+        for name in ([kind] if kind else list(self.current)):
+            stop = self.current.pop(name, None)
+            if stop is not None:
+                stop.set()
+
+    def _run(self):
+        while True:
+            kind, stop, job, callback = self.jobs.get()
+            if stop.is_set():
+                continue
+            try:
+                result = job(stop)
+            except Exception as error:
+                result = error
+            self.results.put((kind, stop, callback, result))
+
+    def _poll(self):
+        # reschedule first, so a failing job or callback cannot stop the polling
+        self.root.after(self.poll_ms, self._poll)
+        while True:
+            try:
+                kind, stop, callback, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if stop.is_set() or self.current.get(kind) is not stop:
+                continue
+            del self.current[kind]
+            if isinstance(result, Exception):
+                self.report(kind, result)
+            else:
+                callback(result)
+
+    def report(self, kind, error):
+        if self.on_error is not None:
+            self.on_error(kind, error)
+        else:
+            messagebox.showerror("Engine error", f"The {kind} job failed: {error!r}")
+
+
 class ChessApp:
 
-    def __init__(self, root):
+    def __init__(self, root, computer=None, fen=None):
         self.root = root
         self.root.title("CHESS GAME")
-        self.board = [row[:] for row in initial_board]
+        self.position = Position.from_fen(fen) if fen else Position(initial_board)
         self.selected_piece = None
-        self.current_turn = "white"
-        self.history = []
         self.square_colors = {}
-
-        self.king_moved = {"white": False, "black": False}
-        self.rook_moved =  {
-            "white" : {"left":False, "right":False},
-            "black" : {"left":False, "right":False}
-                            }
+        self.shown = {}    # (row, col) -> piece letter currently drawn on that button
+        self.painted = {}  # (row, col) -> highlight colour on squares not showing their own colour
+        self.computer = computer
+        self.engine = None
+        if computer:
+            book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+            self.engine = Engine(book=book, tablebase=Tablebase(background=True))
+        self.worker = EngineWorker(root)
+        self.game_over = False
         self.create_board()
+        self.after_move()
+
+    @property
+    def current_turn(self):
+        return self.position.turn
 
 
     def create_board(self):
@@ -49,8 +133,9 @@ class ChessApp:
                     color = "#3F87D5"
 
                 self.square_colors[(row , col)] = color
+                self.shown[(row , col)] = self.position.piece_at(row, col)
 
-                btn  =  tk.Button(self.root, text = pieces.get(self.board[row][col], ""),font = ("Segoe UI Symbol",28) , width = 2, height = 1, bg = color,relief = "flat" , command = lambda r = row, c = col : self.on_click(r,c))
+                btn  =  tk.Button(self.root, text = pieces.get(self.shown[(row , col)], ""),font = ("Segoe UI Symbol",28) , width = 2, height = 1, bg = color,relief = "flat" , command = lambda r = row, c = col : self.on_click(r,c))
                 btn.grid(row = row , column = col)
                 row_buttons.append(btn)
             self.buttons.append(row_buttons)
@@ -58,281 +143,219 @@ class ChessApp:
         undo_btn = tk.Button(self.root, text = "Undo", font=("Arial",14),command = self.undo_move)
         undo_btn.grid(row = BOARD_SIZE, column = 0, columnspan=BOARD_SIZE, sticky="we")
 
+        save_btn = tk.Button(self.root, text = "Save", font=("Arial",14),command = self.save_game)
+        save_btn.grid(row = BOARD_SIZE + 1, column = 0, columnspan=BOARD_SIZE // 2, sticky="we")
+        load_btn = tk.Button(self.root, text = "Load", font=("Arial",14),command = self.load_game)
+        load_btn.grid(row = BOARD_SIZE + 1, column = BOARD_SIZE // 2, columnspan=BOARD_SIZE // 2, sticky="we")
+
+    def save_game(self):
+        path = filedialog.asksaveasfilename(defaultextension=".pgn", filetypes=[("PGN game", "*.pgn"), ("FEN position", "*.fen")])
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as handle:
+            if path.lower().endswith(".fen"):
+                handle.write(self.position.to_fen() + "\n")
+            else:
+                handle.write(write_pgn(self.position, {"Event": "Chess.py game"}))
+
+    def load_game(self):
+        path = filedialog.askopenfilename(filetypes=[("PGN game", "*.pgn"), ("FEN position", "*.fen")])
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8") as handle:
+                if path.lower().endswith(".fen"):
+                    position = Position.from_fen(handle.readline())
+                else:
+                    headers, tokens = next(read_games(handle))
+                    position = replay(headers, tokens)
+        except (PGNError, ValueError, StopIteration) as error:
+            messagebox.showinfo("Load failed", str(error) or "No game found in the file.")
+            return
+        self.worker.cancel()
+        self.position = position
+        self.selected_piece = None
+        self.game_over = False
+        self.update_board()
+        self.after_move()
+
     def on_click(self, row, col):
+        # a new click makes any pending highlight work stale
+        self.worker.cancel("highlight")
+        if self.game_over or self.computer == self.current_turn:
+            return
         if self.selected_piece:
             sr, sc = self.selected_piece
             self.buttons[sr][sc].config(relief = "raised")
-            if self.is_valid_move(sr, sc, row, col):
-                
-                saved_src = self.board[sr][sc]
-                saved_dst = self.board[row][col]
-
-                self.history.append([r[:] for r in self.board])
-
-                self.board[row][col] = saved_src
-                self.board[sr][sc] = ""
-
-                if self.is_in_check(self.current_turn):
-                    self.board = self.history.pop()
-                    self.update_board()
-                    self.selected_piece = None
-                    return
-                    
-                if saved_src.lower() == "k" and abs(col - sc) == 2:
-                    if col > sc:
-                        self.board[row][5] = self.board[row][7]
-                        self.board[row][7] = ""
-                    else:
-                        self.board[row][3] = self.board[row][0]
-                        self.board[row][0] = ""
-
-                if saved_src.lower() == "k":
-                    self.king_moved[self.current_turn] = True
-                if saved_src.lower() == "r":
-                    if sc == 0:
-                        self.rook_moved[self.current_turn]["left"] = True
-                    elif sc ==7:
-                        self.rook_moved[self.current_turn]["right"] = True
-
-                self.switch_turn()
+            move = self.position.find_move(sr, sc, row, col)
+            if move is not None and move >> 16:
+                # a promotion: let the player choose the piece, or back out
+                promotion = self.ask_promotion()
+                move = self.position.find_move(sr, sc, row, col, promotion) if promotion else None
+            if move is not None:
+
+                self.position.make(move)
                 self.update_board()
-
-                if self.is_checkmate():
-                    messagebox.showinfo("Game Over",f"{'Black' if self.current_turn == 'white' else 'White'} wins by checkmate!")
-                    self.root.quit()
-
-                
+                self.after_move()
 
             self.selected_piece = None
 
-        elif self.board[row][col] != "" and self.is_correct_turn(row,col):
+        elif self.position.piece_at(row, col) != "" and self.is_correct_turn(row,col):
             self.reset_highlights()
             self.selected_piece = (row,col)
-            self.buttons[row][col].config(bg="#FFD700")
+            self.paint(row, col, "#FFD700")
             self.highlight_moves(row,col)
 
-    def reset_highlights(self):
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                self.buttons[row][col].config(bg=self.square_colors[(row , col)])
+    def ask_promotion(self):
+        """Modal picker for the promotion piece; returns its kind, or None if the window is closed."""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Promote to")
+        dialog.transient(self.root)
+        choice = []
+        colour = COLORS[self.current_turn]
+        for i, kind in enumerate(PROMOTIONS):
+            letter = LETTERS[colour | kind]
+            tk.Button(dialog, text = pieces[letter], font = ("Segoe UI Symbol",28), width = 2,
+                      command = lambda k = kind: (choice.append(k), dialog.destroy())).grid(row = 0, column = i)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return choice[0] if choice else None
+
+    def after_move(self):
+        """Check for the end of the game, then let the computer reply, all off the Tk thread."""
+        position = self.position.copy()
+
+        def job(stop):
+            if position.is_checkmate():
+                return "checkmate"
+            if position.is_stalemate():
+                return "stalemate"
+            if position.is_fifty_move_draw():
+                return "fifty"
+            if position.is_threefold_repetition():
+                return "repetition"
+            return None
+
+        self.worker.submit("status", job, self.on_status)
+
+    def on_status(self, status):
+        if status == "checkmate":
+            messagebox.showinfo("Game Over",f"{'Black' if self.current_turn == 'white' else 'White'} wins by checkmate!")
+        elif status == "stalemate":
+            messagebox.showinfo("Game Over","Draw by stalemate!")
+        elif status == "fifty":
+            messagebox.showinfo("Game Over","Draw by the fifty-move rule!")
+        elif status == "repetition":
+            messagebox.showinfo("Game Over","Draw by threefold repetition!")
+        elif self.computer == self.current_turn:
+            self.computer_move()
+            return
+        else:
+            return
+        self.game_over = True
+        self.root.quit()
 
-    def move_piece(self, src_row, src_col,dest_row, dest_col):
-        self.board[dest_row][dest_col] = self.board[src_row][src_col]
-        self.board[src_row][src_col] = ""
-        self.update_board()
-        if self.is_checkmate():
-            messagebox.showinfo("Game Over",f"{self.current_turn.capitalize()} wins by checkmate!")
-            self.root.quit()
+    def computer_move(self):
+        if self.game_over or self.computer != self.current_turn:
+            return
+        position = self.position.copy()
+        key = self.position.hash
+
+        def job(stop):
+            return self.engine.search(position, AI_TIME_LIMIT, stop=stop)
+
+        def done(result):
+            if result.move is None or self.position.hash != key:
+                return
+            self.position.make(result.move)
+            self.update_board()
+            self.after_move()
+
+        self.worker.submit("search", job, done)
+
+    def paint(self, row, col, color):
+        if self.painted.get((row, col)) != color:
+            self.painted[(row, col)] = color
+            self.buttons[row][col].config(bg=color)
+
+    def reset_highlights(self):
+        # only the squares painted since the last reset need their colour back
+        for (row, col) in self.painted:
+            self.buttons[row][col].config(bg=self.square_colors[(row , col)])
+        self.painted.clear()
 
     def highlight_check(self):
         if self.is_in_check(self.current_turn):
             king_pos = self.find_king(self.current_turn)
             if king_pos:
                 r,c = king_pos
-                self.buttons[r][c].config(bg = "#FB0404")
+                self.paint(r, c, "#FB0404")
 
     def highlight_moves(self,row,col):
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.is_valid_move(row,col,r,c):
-                    saved_src = self.board[row][col]
-                    saved_dst = self.board[r][c]
-
-                    self.board[r][c] = saved_src
-                    self.board[row][col] = ""
+        position = self.position.copy()
 
-                    safe = not self.is_in_check(self.current_turn)
+        def job(stop):
+            return position.legal_destinations(row, col)
 
-                    self.board[row][col] = saved_src
-                    self.board[r][c] = saved_dst
+        def done(destinations):
+            if self.selected_piece != (row, col):
+                return
+            for r, c in destinations:
+                if self.position.piece_at(r, c) != "":
+                    self.paint(r, c, "#FFB6C1")
+                else:
+                    self.paint(r, c, "#90EE90")
 
-                    if safe:
-                        if saved_dst != "":
-                            self.buttons[r][c].config(bg="#FFB6C1")
-                        else:
-                            self.buttons[r][c].config(bg="#90EE90")
+        self.worker.submit("highlight", job, done)
 
     def update_board(self):
+        # compare against what is already drawn and only touch buttons that changed
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                self.buttons[row][col]["text"]=pieces.get(self.board[row][col],"")
+                piece = self.position.piece_at(row, col)
+                if self.shown[(row, col)] != piece:
+                    self.shown[(row, col)] = piece
+                    self.buttons[row][col]["text"]=pieces.get(piece,"")
         self.reset_highlights()
         self.highlight_check()
 
-    def switch_turn(self):
-        self.current_turn = "black" if self.current_turn == "white" else "white"
-
     def undo_move(self):
-        if not self.history:
+        self.worker.cancel()
+        if not self.position.stack:
             return
-        
-        self.board = self.history.pop()
-        self.current_turn ="black" if self.current_turn == "white" else "white"
+
+        self.position.unmake()
+        # against the computer, take back its reply too so it is the human's turn again
+        if self.computer == self.current_turn and self.position.stack:
+            self.position.unmake()
+        self.selected_piece = None
         self.update_board()
+        if self.computer == self.current_turn:
+            self.computer_move()
 
     def find_king(self, color):
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                piece = self.board[r][c]
-                if piece == ("K" if color == "white" else "k"):
-                    return r, c
-        return None
-    
-    def is_in_check(self, color):
-        king_pos = self.find_king(color)
-        if not king_pos:
-            return False
-
-        kr, kc = king_pos
-        opponent = "black" if color == "white" else "white"
-
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                piece = self.board[r][c]
-                if piece != "" and (
-                    (piece.isupper() and opponent == "white") or
-                    (piece.islower() and opponent == "black")
-                ):
-                    if self.is_valid_move(r, c, kr, kc):
-                        return True
-        return False
-
+        king = self.position.king_square(COLORS[color])
+        if king is None:
+            return None
+        return row_col(king)
 
+    def is_in_check(self, color):
+        return self.position.in_check(color)
 
     def is_correct_turn(self,row,col):
-        pieces = self.board[row][col]
-        return (pieces.isupper() and self.current_turn == "white") or (pieces.islower() and self.current_turn == "black")
+        piece = self.position.piece_at(row, col)
+        return (piece.isupper() and self.current_turn == "white") or (piece.islower() and self.current_turn == "black")
 
     def is_valid_move(self, src_row, src_col,dest_row, dest_col):
-        pieces = self.board[src_row][src_col]
-        target = self.board[dest_row][dest_col]
-
-        if target != "" and (pieces.isupper() == target.isupper()):
-            return False
-        
-        dr = dest_row - src_row
-        dc = dest_col - src_col
-        #pawn
-        if pieces.lower() == "p":
-            direction = -1 if pieces.isupper() else 1
-            start_row = 6 if pieces.isupper() else 1
-
-            if dc == 0 and dr == direction and target == "":
-                return True
-            
-            if(dc == 0 and src_row == start_row and dr == 2*direction and target == "" and self.board[src_row + direction][src_col]==""):
-                return True
-            
-            if abs(dc) == 1 and dr == direction and target != "":
-                return True
-            
-            return False
-        #rook
-        if pieces.lower() == "r":
-            if dr != 0 and dc != 0:
-                return False
-            
-            step_r = 0 if dr == 0 else dr // abs(dr)
-            step_c = 0 if dc == 0 else dc // abs(dc)
-                        
-            r , c = src_row + step_r, src_col + step_c
-            while (r,c) != (dest_row,dest_col):
-                if self.board[r][c]!= "":
-                    return False
-                r += step_r
-                c += step_c
-            return True
-        #bishop
-        if pieces.lower() == "b":
-            if abs(dr) != abs(dc):
-                return False
-            step_r = dr // abs(dr)
-            step_c = dc // abs(dc)
-
-            r,c = src_row + step_r, src_col + step_c
-            while(r,c) != (dest_row,dest_col):
-                if self.board[r][c] != "":
-                    return False
-                r += step_r
-                c += step_c
-            return True
-        #knight
-        if pieces.lower() == "n":
-            if (abs(dr), abs(dc)) in [(2, 1), (1, 2)]:
-                return True
-            return False
-        #queen
-        if pieces.lower() == "q":
-            if abs(dr) == abs(dc):
-                step_r = dr // abs(dr)
-                step_c = dc // abs(dc)
-            elif dr == 0 or dc == 0:
-                step_r = 0 if dr == 0 else dr // abs(dr)
-                step_c = 0 if dc == 0 else dc // abs(dc)
-            else :
-                return False
-            
-            r,c = src_row + step_r, src_col + step_c
-            while (r,c) != (dest_row,dest_col):
-                if self.board[r][c] != "":
-                    return False
-                r += step_r
-                c += step_c
-            return True
-        
-        #king
-        if pieces.lower() == "k":
-
-            # normal king move
-            if abs(dr) <= 1 and abs(dc) <= 1:
-                return True
-
-            # castling
-            if dr == 0 and abs(dc) == 2:
-                row = src_row
-
-                # king-side castling
-                if dc == 2:
-                    if self.board[row][5] == "" and self.board[row][6] == "" and self.board[row][7].lower() == "r":
-                        return True
-
-                # queen-side castling
-                if dc == -2:
-                    if self.board[row][1] == "" and self.board[row][2] == "" and self.board[row][3] == "" and self.board[row][0].lower() == "r":
-                        return True
-
-            return False
-
-    
+        return self.position.is_valid_move(src_row, src_col, dest_row, dest_col)
+
     def is_checkmate(self):
-        if not self.is_in_check(self.current_turn):
-            return False
-        for sr in range(BOARD_SIZE):
-            for sc in range(BOARD_SIZE):
-                piece = self.board[sr][sc]
-                if piece == "":
-                    continue
-                if (piece.isupper() and self.current_turn == "white") or \
-                    (piece.islower() and self.current_turn == "black"):
-
-                    for dr in range(BOARD_SIZE):
-                        for dc in range(BOARD_SIZE):
-                            if self.is_valid_move(sr,sc,dr,dc):
-                                saved_src = self.board[sr][sc]
-                                saved_dst = self.board[dr][dc]
-
-                                self.board[dr][dc] = saved_src
-                                self.board[sr][sc] = ""
-                                safe = not self.is_in_check(self.current_turn)
-                                self.board[sr][sc] = saved_src
-                                self.board[dr][dc] = saved_dst
-                                if safe:
-                                    return False
-        return True
+        return self.position.is_checkmate()
 
 
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = ChessApp(root)
+    # python Chess.py black  -> play White against the computer
+    app = ChessApp(root, computer=sys.argv[1] if len(sys.argv) > 1 else None)
     root.mainloop()
\ No newline at end of file
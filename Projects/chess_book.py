@@ -0,0 +1,121 @@
+# chess_book.py
+# Opening book: a memory-mapped, Polyglot-style binary file keyed by position hash
+#
+# The file is a sorted array of 16-byte big-endian entries
+# (key: u64, move: u16, weight: u16, learn: u32) like a Polyglot book,
+# but the key is chess_engine's own Zobrist hash and the move is packed
+# as from square (6 bits) | to square << 6 | promotion piece kind << 12,
+# with squares numbered row * 8 + col.
+#
+#   python chess_book.py build games.pgn book.bin [plies]
+#   python chess_book.py probe book.bin "<FEN>"
+
+import mmap
+import random
+import struct
+import sys
+
+from chess_engine import Position, move_name
+from chess_pgn import PGNError, parse_san, read_games, START_FEN
+
+ENTRY = struct.Struct(">QHHI")
+
+
+def pack_move(move):
+    src = move & 127
+    dst = (move >> 7) & 127
+    return ((src >> 4) * 8 + (src & 7)) | ((dst >> 4) * 8 + (dst & 7)) << 6 | (move >> 16) << 12
+
+
+class OpeningBook(object):
+    """Read-only view of a book file; entries are found by binary search on the mapped bytes."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = self.file.seek(0, 2)
+        self.count = size // ENTRY.size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else b""
+
+    def close(self):
+        if self.count:
+            self.data.close()
+        self.file.close()
+
+    def entries(self, key):
+        """(packed move, weight) pairs stored for a position hash."""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if ENTRY.unpack_from(self.data, mid * ENTRY.size)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        results = []
+        while low < self.count:
+            entry_key, packed, weight, _ = ENTRY.unpack_from(self.data, low * ENTRY.size)
+            if entry_key != key:
+                break
+            results.append((packed, weight))
+            low += 1
+        return results
+
+    def moves(self, position):
+        """Legal book moves for `position` as (move, weight) pairs."""
+        entries = self.entries(position.hash)
+        if not entries:
+            return []
+        legal = {pack_move(move): move for move in position.legal_moves()}
+        return [(legal[packed], weight) for packed, weight in entries if packed in legal]
+
+    def pick(self, position, rng=random):
+        """A book move chosen in proportion to its weight, or None when out of book."""
+        moves = self.moves(position)
+        if not moves:
+            return None
+        total = sum(weight for _, weight in moves)
+        if not total:
+            return moves[0][0]
+        point = rng.randrange(total)
+        for move, weight in moves:
+            point -= weight
+            if point < 0:
+                return move
+        return moves[-1][0]
+
+
+def build_book(pgn_path, book_path, plies=16):
+    """Count the first `plies` moves of every game in a PGN file into a book; returns the entry count."""
+    counts = {}
+    with open(pgn_path, encoding="utf-8", errors="replace") as handle:
+        for headers, tokens in read_games(handle):
+            if headers.get("FEN", START_FEN) != START_FEN:
+                continue
+            position = Position.from_fen(START_FEN)
+            for token in tokens[:plies]:
+                try:
+                    move = parse_san(position, token)
+                except PGNError:
+                    break
+                key = (position.hash, pack_move(move))
+                counts[key] = counts.get(key, 0) + 1
+                position.make(move)
+
+    with open(book_path, "wb") as out:
+        for (key, packed), count in sorted(counts.items()):
+            out.write(ENTRY.pack(key, packed, min(count, 0xFFFF), 0))
+    return len(counts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "build":
+        plies = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+        print("%d entries written" % build_book(sys.argv[2], sys.argv[3], plies))
+    elif len(sys.argv) >= 3 and sys.argv[1] == "probe":
+        book = OpeningBook(sys.argv[2])
+        position = Position.from_fen(sys.argv[3] if len(sys.argv) > 3 else START_FEN)
+        for move, weight in sorted(book.moves(position), key=lambda item: -item[1]):
+            print("%s %d" % (move_name(move), weight))
+        book.close()
+    else:
+        raise SystemExit("usage: python chess_book.py build games.pgn book.bin [plies]\n"
+                         "       python chess_book.py probe book.bin [FEN]")
@@ -0,0 +1,729 @@
+# chess_engine.py
+# Headless chess rules used by Chess.py (no Tk needed)
+#
+# The board is a 0x88 array of 128 small ints. Square index is
+# row * 16 + col, with row 0 being Black's back rank so the layout
+# matches the rows and columns of the Tk board. A square is on the
+# board when (sq & 0x88) == 0.
+
+import random
+
+EMPTY = 0
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 1, 2, 3, 4, 5, 6
+
+WHITE = 0
+BLACK = 8
+
+# piece code -> board letter, e.g. WHITE | KNIGHT -> "N", BLACK | KNIGHT -> "n"
+LETTERS = ("", "P", "N", "B", "R", "Q", "K", "", "", "p", "n", "b", "r", "q", "k", "")
+CODES = {letter: code for code, letter in enumerate(LETTERS) if letter}
+
+COLOR_NAMES = {WHITE: "white", BLACK: "black"}
+COLORS = {"white": WHITE, "black": BLACK}
+
+KNIGHT_OFFSETS = (-33, -31, -18, -14, 14, 18, 31, 33)
+BISHOP_OFFSETS = (-17, -15, 15, 17)
+ROOK_OFFSETS = (-16, -1, 1, 16)
+KING_OFFSETS = BISHOP_OFFSETS + ROOK_OFFSETS
+
+# castling rights bits
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING = 15
+
+SQUARES = tuple(row * 16 + col for row in range(8) for col in range(8))
+
+# A move is one int: source square | destination square << 7 | flag << 14
+# | promotion piece kind << 16.
+CASTLE, DOUBLE_PUSH, EN_PASSANT = 1, 2, 3
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+
+def square(row, col):
+    return row * 16 + col
+
+
+def row_col(sq):
+    return sq >> 4, sq & 7
+
+
+def square_name(sq):
+    return "abcdefgh"[sq & 7] + str(8 - (sq >> 4))
+
+
+def encode_move(src, dst, flag=0, promotion=EMPTY):
+    return src | dst << 7 | flag << 14 | promotion << 16
+
+
+def move_src(move):
+    return move & 127
+
+
+def move_dst(move):
+    return (move >> 7) & 127
+
+
+def move_flag(move):
+    return (move >> 14) & 3
+
+
+def move_promotion(move):
+    return move >> 16
+
+
+def move_name(move):
+    """Coordinate notation such as "e2e4" or "e7e8q"."""
+    name = square_name(move & 127) + square_name((move >> 7) & 127)
+    if move >> 16:
+        name += LETTERS[BLACK | move >> 16]
+    return name
+
+
+# DIRECTION[b - a + 119] is the step that walks from square a towards
+# square b along a rank, file or diagonal, or 0 if they are not aligned.
+DIRECTION = [0] * 239
+for _offset in KING_OFFSETS:
+    _delta = _offset
+    for _ in range(7):
+        DIRECTION[_delta + 119] = _offset
+        _delta += _offset
+
+# Zobrist keys: ZOBRIST[piece << 7 | sq], one per castling-rights value and
+# one per en passant file. Seeded so hashes are stable between runs.
+_rng = random.Random(0x88)
+ZOBRIST = [_rng.getrandbits(64) for _ in range(16 * 128)]
+ZOBRIST_SIDE = _rng.getrandbits(64)
+ZOBRIST_CASTLING = [_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_EP = [_rng.getrandbits(64) for _ in range(8)]
+del _rng
+
+# Moving from or to one of these squares clears the matching castling rights.
+CASTLING_MASK = [ALL_CASTLING] * 128
+CASTLING_MASK[square(7, 4)] &= ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[square(7, 7)] &= ~WHITE_KINGSIDE
+CASTLING_MASK[square(7, 0)] &= ~WHITE_QUEENSIDE
+CASTLING_MASK[square(0, 4)] &= ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[square(0, 7)] &= ~BLACK_KINGSIDE
+CASTLING_MASK[square(0, 0)] &= ~BLACK_QUEENSIDE
+
+
+class Position(object):
+    """A chess position: board, side to move, castling rights, en passant square
+    and the halfmove clock and fullmove number of FEN.
+
+    make() and unmake() play and take back moves in place; each make pushes
+    one small tuple of the state it overwrites onto self.stack.
+    """
+
+    def __init__(self, rows=None, turn="white", castling=ALL_CASTLING):
+        self.squares = [EMPTY] * 128
+        if rows is not None:
+            for row in range(8):
+                for col in range(8):
+                    letter = rows[row][col]
+                    if letter:
+                        self.squares[square(row, col)] = CODES[letter]
+        self.side = COLORS[turn]
+        self.castling = castling
+        self.ep = None
+        self.halfmove = 0
+        self.fullmove = 1
+        self.kings = [self._find_king(WHITE), self._find_king(BLACK)]
+        self.stack = []
+        self._safety = None
+        self.hash = self.compute_hash()
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Position from a FEN string; the two move counters are optional."""
+        fields = fen.split()
+        ranks = fields[0].split("/")
+        if len(fields) < 4 or len(ranks) != 8:
+            raise ValueError("bad FEN: %r" % fen)
+        rows = []
+        for rank in ranks:
+            row = []
+            for ch in rank:
+                if ch.isdigit():
+                    row.extend([""] * int(ch))
+                elif ch in CODES:
+                    row.append(ch)
+                else:
+                    raise ValueError("bad FEN piece: %r" % ch)
+            if len(row) != 8:
+                raise ValueError("bad FEN rank: %r" % rank)
+            rows.append(row)
+        castling = 0
+        for ch in fields[2]:
+            if ch != "-":
+                castling |= 1 << "KQkq".index(ch)
+        position = cls(rows, "white" if fields[1] == "w" else "black", castling)
+        if fields[3] != "-":
+            if len(fields[3]) != 2 or fields[3][0] not in "abcdefgh" or fields[3][1] not in "36":
+                raise ValueError("bad FEN en passant square: %r" % fields[3])
+            ep = square(8 - int(fields[3][1]), "abcdefgh".index(fields[3][0]))
+            pawn = ep - 16 if position.side == BLACK else ep + 16
+            if position._ep_capturable(pawn):
+                position.ep = ep
+                position.hash = position.compute_hash()
+        if len(fields) >= 6:
+            position.halfmove = int(fields[4])
+            position.fullmove = int(fields[5])
+        return position
+
+    def to_fen(self):
+        ranks = []
+        for row in range(8):
+            rank = ""
+            empty = 0
+            for col in range(8):
+                letter = LETTERS[self.squares[row * 16 + col]]
+                if letter:
+                    if empty:
+                        rank += str(empty)
+                        empty = 0
+                    rank += letter
+                else:
+                    empty += 1
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        castling = "".join(ch for bit, ch in zip((1, 2, 4, 8), "KQkq") if self.castling & bit) or "-"
+        ep = square_name(self.ep) if self.ep is not None else "-"
+        return "%s %s %s %s %d %d" % ("/".join(ranks), "w" if self.side == WHITE else "b",
+                                      castling, ep, self.halfmove, self.fullmove)
+
+    def copy(self):
+        other = Position.__new__(Position)
+        other.squares = self.squares[:]
+        other.side = self.side
+        other.castling = self.castling
+        other.ep = self.ep
+        other.halfmove = self.halfmove
+        other.fullmove = self.fullmove
+        other.kings = self.kings[:]
+        other.stack = self.stack[:]
+        other._safety = self._safety
+        other.hash = self.hash
+        return other
+
+    def compute_hash(self):
+        """Zobrist hash of the position from scratch; make() keeps self.hash in step."""
+        key = ZOBRIST_CASTLING[self.castling]
+        for sq in SQUARES:
+            piece = self.squares[sq]
+            if piece:
+                key ^= ZOBRIST[piece << 7 | sq]
+        if self.side == BLACK:
+            key ^= ZOBRIST_SIDE
+        if self.ep is not None:
+            key ^= ZOBRIST_EP[self.ep & 7]
+        return key
+
+    def repetitions(self):
+        """How many earlier positions in this game are the same as the current one."""
+        count = 0
+        key = self.hash
+        stack = self.stack
+        # nothing before the last capture or pawn move can come back
+        for i in range(len(stack) - 2, max(len(stack) - self.halfmove, 0) - 1, -2):
+            if stack[i][5] == key:
+                count += 1
+        return count
+
+    def is_threefold_repetition(self):
+        return self.repetitions() >= 2
+
+    @property
+    def turn(self):
+        return COLOR_NAMES[self.side]
+
+    def piece_at(self, row, col):
+        return LETTERS[self.squares[square(row, col)]]
+
+    def rows(self):
+        return [[LETTERS[self.squares[row * 16 + col]] for col in range(8)] for row in range(8)]
+
+    def _find_king(self, side):
+        try:
+            return self.squares.index(side | KING)
+        except ValueError:
+            return None
+
+    def king_square(self, side):
+        return self.kings[side >> 3]
+
+    def is_attacked(self, sq, by):
+        """True if any piece of colour `by` attacks square `sq`."""
+        board = self.squares
+
+        # a pawn attacks diagonally forward, so look one row behind it
+        pawn = by | PAWN
+        for offset in ((15, 17) if by == WHITE else (-15, -17)):
+            target = sq + offset
+            if not target & 0x88 and board[target] == pawn:
+                return True
+
+        knight = by | KNIGHT
+        for offset in KNIGHT_OFFSETS:
+            target = sq + offset
+            if not target & 0x88 and board[target] == knight:
+                return True
+
+        king = by | KING
+        for offset in KING_OFFSETS:
+            target = sq + offset
+            if not target & 0x88 and board[target] == king:
+                return True
+
+        bishop, rook, queen = by | BISHOP, by | ROOK, by | QUEEN
+        for offset in BISHOP_OFFSETS:
+            target = sq + offset
+            while not target & 0x88:
+                piece = board[target]
+                if piece:
+                    if piece == bishop or piece == queen:
+                        return True
+                    break
+                target += offset
+        for offset in ROOK_OFFSETS:
+            target = sq + offset
+            while not target & 0x88:
+                piece = board[target]
+                if piece:
+                    if piece == rook or piece == queen:
+                        return True
+                    break
+                target += offset
+        return False
+
+    def in_check(self, color):
+        side = COLORS[color]
+        if side == self.side:
+            return self.safety()[0] > 0
+        king = self.kings[side >> 3]
+        if king is None:
+            return False
+        return self.is_attacked(king, side ^ BLACK)
+
+    def _path_clear(self, src, dst, offset):
+        board = self.squares
+        sq = src + offset
+        while sq != dst:
+            if board[sq]:
+                return False
+            sq += offset
+        return True
+
+    def is_valid_move(self, src_row, src_col, dest_row, dest_col):
+        """Pseudo-legal test: obeys piece movement but ignores own check."""
+        board = self.squares
+        src = square(src_row, src_col)
+        dst = square(dest_row, dest_col)
+        piece = board[src]
+        target = board[dst]
+        if not piece or src == dst:
+            return False
+        color = piece & BLACK
+        if target and (target & BLACK) == color:
+            return False
+
+        kind = piece & 7
+        dr = dest_row - src_row
+        dc = dest_col - src_col
+
+        if kind == PAWN:
+            direction = -1 if color == WHITE else 1
+            start_row = 6 if color == WHITE else 1
+            if dc == 0 and not target:
+                if dr == direction:
+                    return True
+                if dr == 2 * direction and src_row == start_row and not board[src + 16 * direction]:
+                    return True
+            return abs(dc) == 1 and dr == direction and (target != EMPTY or dst == self.ep)
+
+        if kind == KNIGHT:
+            return (abs(dr), abs(dc)) in ((2, 1), (1, 2))
+
+        if kind == KING:
+            if abs(dr) <= 1 and abs(dc) <= 1:
+                return True
+            if dr == 0 and abs(dc) == 2:
+                return self._can_castle(color, dc > 0)
+            return False
+
+        # sliders: bishop, rook, queen
+        straight = dr == 0 or dc == 0
+        diagonal = abs(dr) == abs(dc)
+        if kind == BISHOP and not diagonal:
+            return False
+        if kind == ROOK and not straight:
+            return False
+        if kind == QUEEN and not (straight or diagonal):
+            return False
+        step_r = (dr > 0) - (dr < 0)
+        step_c = (dc > 0) - (dc < 0)
+        return self._path_clear(src, dst, step_r * 16 + step_c)
+
+    def _can_castle(self, color, kingside):
+        board = self.squares
+        row = 7 if color == WHITE else 0
+        if kingside:
+            right = WHITE_KINGSIDE if color == WHITE else BLACK_KINGSIDE
+            empty = (5, 6)
+            rook_col = 7
+        else:
+            right = WHITE_QUEENSIDE if color == WHITE else BLACK_QUEENSIDE
+            empty = (1, 2, 3)
+            rook_col = 0
+        if not self.castling & right:
+            return False
+        if board[square(row, rook_col)] != color | ROOK:
+            return False
+        if not all(board[square(row, col)] == EMPTY for col in empty):
+            return False
+        # the king may not castle out of or through check; landing in check
+        # is caught by the normal king-move test
+        enemy = color ^ BLACK
+        king = square(row, 4)
+        return not self.is_attacked(king, enemy) and not self.is_attacked(king + (1 if kingside else -1), enemy)
+
+    def _ep_capturable(self, pawn):
+        """True if the pawn that just double-pushed to `pawn` has an enemy pawn beside it."""
+        board = self.squares
+        enemy_pawn = (board[pawn] & BLACK) ^ BLACK | PAWN
+        return ((not (pawn - 1) & 0x88 and board[pawn - 1] == enemy_pawn) or
+                (not (pawn + 1) & 0x88 and board[pawn + 1] == enemy_pawn))
+
+    def make(self, move):
+        """Play `move` and pass the turn; unmake() takes it back."""
+        board = self.squares
+        src = move & 127
+        dst = (move >> 7) & 127
+        flag = (move >> 14) & 3
+        piece = board[src]
+        captured = board[dst]
+        key = self.hash
+        self.stack.append((move, captured, self.castling, self.ep, self._safety, key, self.halfmove))
+
+        board[dst] = piece
+        board[src] = EMPTY
+        key ^= ZOBRIST[piece << 7 | src]
+        if captured:
+            key ^= ZOBRIST[captured << 7 | dst]
+        if flag == CASTLE:
+            rook = board[src + 3] if dst > src else board[src - 4]
+            if dst > src:
+                board[src + 1] = rook
+                board[src + 3] = EMPTY
+                key ^= ZOBRIST[rook << 7 | src + 3] ^ ZOBRIST[rook << 7 | src + 1]
+            else:
+                board[src - 1] = rook
+                board[src - 4] = EMPTY
+                key ^= ZOBRIST[rook << 7 | src - 4] ^ ZOBRIST[rook << 7 | src - 1]
+        elif flag == EN_PASSANT:
+            victim = dst + (16 if piece == PAWN else -16)
+            key ^= ZOBRIST[board[victim] << 7 | victim]
+            board[victim] = EMPTY
+        if move >> 16:
+            piece = (piece & BLACK) | move >> 16
+            board[dst] = piece
+        key ^= ZOBRIST[piece << 7 | dst]
+        if piece & 7 == KING:
+            self.kings[piece >> 3] = dst
+
+        castling = self.castling & CASTLING_MASK[src] & CASTLING_MASK[dst]
+        if castling != self.castling:
+            key ^= ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_CASTLING[castling]
+            self.castling = castling
+        if self.ep is not None:
+            key ^= ZOBRIST_EP[self.ep & 7]
+        self.ep = None
+        # only record the square when an enemy pawn could take en passant,
+        # so otherwise identical positions hash the same
+        if flag == DOUBLE_PUSH and self._ep_capturable(dst):
+            self.ep = (src + dst) >> 1
+            key ^= ZOBRIST_EP[dst & 7]
+        if captured or piece & 7 == PAWN or move >> 16:
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+        if piece & BLACK:
+            self.fullmove += 1
+        self.side ^= BLACK
+        self.hash = key ^ ZOBRIST_SIDE
+        self._safety = None
+
+    def unmake(self):
+        """Take back the last move played with make()."""
+        move, captured, self.castling, self.ep, self._safety, self.hash, self.halfmove = self.stack.pop()
+        board = self.squares
+        src = move & 127
+        dst = (move >> 7) & 127
+        flag = (move >> 14) & 3
+        self.side ^= BLACK
+        side = self.side
+        if side == BLACK:
+            self.fullmove -= 1
+
+        piece = side | PAWN if move >> 16 else board[dst]
+        board[src] = piece
+        board[dst] = captured
+        if flag == CASTLE:
+            if dst > src:
+                board[src + 3] = board[src + 1]
+                board[src + 1] = EMPTY
+            else:
+                board[src - 4] = board[src - 1]
+                board[src - 1] = EMPTY
+        elif flag == EN_PASSANT:
+            board[dst + (16 if side == WHITE else -16)] = (side ^ BLACK) | PAWN
+        if piece & 7 == KING:
+            self.kings[side >> 3] = src
+
+    def find_move(self, src_row, src_col, dest_row, dest_col, promotion=None):
+        """The legal move from (src_row, src_col) to (dest_row, dest_col), or None.
+
+        `promotion` picks the piece kind a pawn promotes to; by default the
+        first one listed in PROMOTIONS (the queen).
+        """
+        src = square(src_row, src_col)
+        dst = square(dest_row, dest_col)
+        for move in self.legal_moves():
+            if move & 127 == src and (move >> 7) & 127 == dst:
+                if promotion is None or move >> 16 == promotion:
+                    return move
+        return None
+
+    def generate_moves(self, moves=None):
+        """Append every pseudo-legal move for the side to move to `moves`."""
+        if moves is None:
+            moves = []
+        board = self.squares
+        side = self.side
+        enemy = side ^ BLACK
+        for src in SQUARES:
+            piece = board[src]
+            if not piece or (piece & BLACK) != side:
+                continue
+            kind = piece & 7
+
+            if kind == PAWN:
+                forward = -16 if side == WHITE else 16
+                promoting = (src + forward) >> 4 == (0 if side == WHITE else 7)
+                dst = src + forward
+                if not dst & 0x88 and not board[dst]:
+                    if promoting:
+                        for promoted in PROMOTIONS:
+                            moves.append(src | dst << 7 | promoted << 16)
+                    else:
+                        moves.append(src | dst << 7)
+                        start_row = 6 if side == WHITE else 1
+                        if src >> 4 == start_row and not board[dst + forward]:
+                            moves.append(src | (dst + forward) << 7 | DOUBLE_PUSH << 14)
+                for dst in (src + forward - 1, src + forward + 1):
+                    if dst & 0x88:
+                        continue
+                    if board[dst] and (board[dst] & BLACK) == enemy:
+                        if promoting:
+                            for promoted in PROMOTIONS:
+                                moves.append(src | dst << 7 | promoted << 16)
+                        else:
+                            moves.append(src | dst << 7)
+                    elif dst == self.ep:
+                        moves.append(src | dst << 7 | EN_PASSANT << 14)
+
+            elif kind == KNIGHT or kind == KING:
+                for offset in (KNIGHT_OFFSETS if kind == KNIGHT else KING_OFFSETS):
+                    dst = src + offset
+                    if dst & 0x88:
+                        continue
+                    target = board[dst]
+                    if not target or (target & BLACK) == enemy:
+                        moves.append(src | dst << 7)
+                if kind == KING:
+                    if self._can_castle(side, True):
+                        moves.append(src | (src + 2) << 7 | CASTLE << 14)
+                    if self._can_castle(side, False):
+                        moves.append(src | (src - 2) << 7 | CASTLE << 14)
+
+            else:
+                if kind == BISHOP:
+                    offsets = BISHOP_OFFSETS
+                elif kind == ROOK:
+                    offsets = ROOK_OFFSETS
+                else:
+                    offsets = KING_OFFSETS
+                for offset in offsets:
+                    dst = src + offset
+                    while not dst & 0x88:
+                        target = board[dst]
+                        if target:
+                            if (target & BLACK) == enemy:
+                                moves.append(src | dst << 7)
+                            break
+                        moves.append(src | dst << 7)
+                        dst += offset
+        return moves
+
+    def safety(self):
+        """Checkers and pins against the side to move, found by walking out from its king.
+
+        Returns (checks, block, pins): the number of pieces giving check, the
+        set of squares a non-king move must land on to answer a single check,
+        and a dict of pinned square -> direction from the king along the pin.
+        Cached until the next move.
+        """
+        if self._safety is not None:
+            return self._safety
+        board = self.squares
+        side = self.side
+        enemy = side ^ BLACK
+        king = self.kings[side >> 3]
+        checks = 0
+        block = set()
+        pins = {}
+        if king is not None:
+            for offset in ((-17, -15) if side == WHITE else (15, 17)):
+                sq = king + offset
+                if not sq & 0x88 and board[sq] == enemy | PAWN:
+                    checks += 1
+                    block.add(sq)
+            for offset in KNIGHT_OFFSETS:
+                sq = king + offset
+                if not sq & 0x88 and board[sq] == enemy | KNIGHT:
+                    checks += 1
+                    block.add(sq)
+            for offset in KING_OFFSETS:
+                slider = enemy | (BISHOP if offset in BISHOP_OFFSETS else ROOK)
+                queen = enemy | QUEEN
+                shield = None
+                sq = king + offset
+                while not sq & 0x88:
+                    piece = board[sq]
+                    if piece:
+                        if (piece & BLACK) == side:
+                            if shield is not None:
+                                break
+                            shield = sq
+                        else:
+                            if piece == slider or piece == queen:
+                                if shield is None:
+                                    checks += 1
+                                    ray = king + offset
+                                    while ray != sq:
+                                        block.add(ray)
+                                        ray += offset
+                                    block.add(sq)
+                                else:
+                                    pins[shield] = offset
+                            break
+                    sq += offset
+        self._safety = (checks, block, pins)
+        return self._safety
+
+    def _king_move_safe(self, king, dst):
+        board = self.squares
+        piece = board[king]
+        captured = board[dst]
+        board[king] = EMPTY
+        board[dst] = piece
+        safe = not self.is_attacked(dst, (piece & BLACK) ^ BLACK)
+        board[king] = piece
+        board[dst] = captured
+        return safe
+
+    def leaves_king_safe(self, move):
+        """True if playing `move` does not leave the mover's own king attacked."""
+        src = move & 127
+        dst = (move >> 7) & 127
+        king = self.kings[self.side >> 3]
+        if king is None:
+            return True
+        if src == king:
+            return self._king_move_safe(king, dst)
+        if (move >> 14) & 3 == EN_PASSANT:
+            # two pawns leave the same rank at once, which pins do not describe
+            self.make(move)
+            safe = not self.is_attacked(king, self.side)
+            self.unmake()
+            return safe
+        checks, block, pins = self.safety()
+        if checks > 1:
+            return False
+        if checks and dst not in block:
+            return False
+        pin = pins.get(src)
+        return pin is None or DIRECTION[dst - king + 119] == pin
+
+    def legal_moves(self):
+        return [move for move in self.generate_moves() if self.leaves_king_safe(move)]
+
+    def legal_destinations(self, row, col):
+        """Squares the piece on (row, col) may legally move to, as (row, col) pairs."""
+        src = square(row, col)
+        return [row_col((move >> 7) & 127) for move in self.generate_moves()
+                if move & 127 == src and self.leaves_king_safe(move)]
+
+    def is_legal(self, src_row, src_col, dest_row, dest_col):
+        """is_valid_move plus 'does not leave the mover's own king in check'."""
+        return self.find_move(src_row, src_col, dest_row, dest_col) is not None
+
+    def has_legal_move(self):
+        for move in self.generate_moves():
+            if self.leaves_king_safe(move):
+                return True
+        return False
+
+    def is_checkmate(self):
+        return self.in_check(self.turn) and not self.has_legal_move()
+
+    def is_stalemate(self):
+        return not self.in_check(self.turn) and not self.has_legal_move()
+
+    def is_fifty_move_draw(self):
+        """100 plies without a capture or pawn move."""
+        return self.halfmove >= 100
+
+
+class TranspositionTable(object):
+    """Fixed-size table of search results keyed by Zobrist hash.
+
+    Each slot holds (depth, bound, value, move, generation). A slot is
+    overwritten when it belongs to the same position, was written during an
+    older search, or was searched no deeper than the new result.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=1 << 18):
+        slots = 1
+        while slots < size:
+            slots <<= 1
+        self.mask = slots - 1
+        self.keys = [0] * slots
+        self.entries = [None] * slots
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.keys) - self.entries.count(None)
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.keys = [0] * len(self.keys)
+        self.entries = [None] * len(self.entries)
+        self.generation = 0
+
+    def probe(self, key):
+        index = key & self.mask
+        if self.keys[index] == key:
+            return self.entries[index]
+        return None
+
+    def store(self, key, depth, bound, value, move):
+        index = key & self.mask
+        old = self.entries[index]
+        if (old is None or self.keys[index] == key or old[4] != self.generation
+                or depth >= old[0]):
+            self.keys[index] = key
+            self.entries[index] = (depth, bound, value, move, self.generation)
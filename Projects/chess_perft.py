@@ -0,0 +1,111 @@
+# chess_perft.py
+# Perft: count leaf nodes of the move tree to check and time chess_engine
+#
+#   python chess_perft.py                      run the suite below
+#   python chess_perft.py 5                    start position to depth 5
+#   python chess_perft.py 3 --fen "<FEN>"      any position
+#   python chess_perft.py 3 --divide           nodes under each root move
+
+import argparse
+import time
+
+from chess_engine import Position, move_name
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# (name, FEN, known node counts for depth 1, 2, 3, ...)
+SUITE = [
+    ("start", START_FEN,
+     [20, 400, 8902, 197281, 4865609]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487]),
+]
+
+
+def perft(position, depth):
+    """Number of leaf nodes `depth` plies below `position`."""
+    if depth == 0:
+        return 1
+    moves = position.generate_moves()
+    if depth == 1:
+        count = 0
+        for move in moves:
+            if position.leaves_king_safe(move):
+                count += 1
+        return count
+    nodes = 0
+    for move in moves:
+        if position.leaves_king_safe(move):
+            position.make(move)
+            nodes += perft(position, depth - 1)
+            position.unmake()
+    return nodes
+
+
+def divide(position, depth):
+    """Perft split by root move, as a list of (move name, nodes)."""
+    results = []
+    for move in position.legal_moves():
+        position.make(move)
+        results.append((move_name(move), perft(position, depth - 1)))
+        position.unmake()
+    return sorted(results)
+
+
+def run_suite(max_nodes=250000):
+    """Run every suite position to the deepest depth with at most `max_nodes` leaves."""
+    all_ok = True
+    total_nodes = 0
+    total_time = 0.0
+    for name, fen, expected in SUITE:
+        for depth, known in enumerate(expected, 1):
+            if depth > 1 and known > max_nodes:
+                break
+            position = Position.from_fen(fen)
+            start = time.perf_counter()
+            nodes = perft(position, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            status = "ok" if nodes == known else "FAIL (expected %d)" % known
+            all_ok = all_ok and nodes == known
+            print("%-10s depth %d  %9d nodes  %8.0f nps  %s"
+                  % (name, depth, nodes, nodes / max(elapsed, 1e-9), status))
+    print("total %d nodes in %.2fs, %.0f nps" % (total_nodes, total_time, total_nodes / max(total_time, 1e-9)))
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft for chess_engine.Position")
+    parser.add_argument("depth", type=int, nargs="?", help="search depth (omit to run the suite)")
+    parser.add_argument("--fen", default=START_FEN, help="position to search")
+    parser.add_argument("--divide", action="store_true", help="print node counts per root move")
+    parser.add_argument("--max-nodes", type=int, default=250000,
+                        help="suite mode: skip depths with more known nodes than this")
+    args = parser.parse_args()
+
+    if args.depth is None:
+        raise SystemExit(0 if run_suite(args.max_nodes) else 1)
+
+    position = Position.from_fen(args.fen)
+    start = time.perf_counter()
+    if args.divide:
+        results = divide(position, args.depth)
+        for name, nodes in results:
+            print("%s: %d" % (name, nodes))
+        nodes = sum(count for _, count in results)
+        print("moves: %d" % len(results))
+    else:
+        nodes = perft(position, args.depth)
+    elapsed = time.perf_counter() - start
+    print("nodes: %d  time: %.2fs  nps: %.0f" % (nodes, elapsed, nodes / max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
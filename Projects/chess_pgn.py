@@ -0,0 +1,234 @@
+# chess_pgn.py
+# SAN moves, PGN reading/writing and batch replay through chess_engine
+#
+#   python chess_pgn.py games.pgn      replay and validate every game in the file
+
+import re
+import sys
+import time
+
+from chess_engine import (
+    Position, PAWN, BLACK, LETTERS, CASTLE, EN_PASSANT, square_name,
+)
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+HEADER_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+TOKEN_RE = re.compile(r"\{[^}]*\}?|;.*|\(|\)|\$\d+|[^\s(){};]+")
+MOVE_NUMBER_RE = re.compile(r"^\d+\.+$|^\d+\.+(?=\S)")
+
+
+class PGNError(ValueError):
+    pass
+
+
+def move_to_san(position, move):
+    """Standard algebraic notation for a legal move in `position`."""
+    board = position.squares
+    src = move & 127
+    dst = (move >> 7) & 127
+    piece = board[src]
+    kind = piece & 7
+
+    if (move >> 14) & 3 == CASTLE:
+        san = "O-O" if dst > src else "O-O-O"
+    else:
+        capture = board[dst] or (move >> 14) & 3 == EN_PASSANT
+        if kind == PAWN:
+            san = (square_name(src)[0] + "x" if capture else "") + square_name(dst)
+            if move >> 16:
+                san += "=" + LETTERS[move >> 16]
+        else:
+            san = LETTERS[kind]
+            rivals = [other & 127 for other in position.legal_moves()
+                      if other != move and (other >> 7) & 127 == dst and board[other & 127] == piece]
+            if rivals:
+                if all((other & 7) != (src & 7) for other in rivals):
+                    san += square_name(src)[0]
+                elif all((other >> 4) != (src >> 4) for other in rivals):
+                    san += square_name(src)[1]
+                else:
+                    san += square_name(src)
+            san += ("x" if capture else "") + square_name(dst)
+
+    position.make(move)
+    if position.safety()[0]:
+        san += "#" if not position.has_legal_move() else "+"
+    position.unmake()
+    return san
+
+
+def parse_san(position, text):
+    """The legal move in `position` written as `text` in SAN; raises PGNError otherwise."""
+    san = text.rstrip("+#!?")
+    board = position.squares
+    legal = position.legal_moves()
+
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        kingside = len(san) == 3
+        for move in legal:
+            if (move >> 14) & 3 == CASTLE and (((move >> 7) & 127) > (move & 127)) == kingside:
+                return move
+        raise PGNError("illegal castling %r in %s" % (text, position.to_fen()))
+
+    promotion = 0
+    if "=" in san:
+        san, letter = san.split("=", 1)
+        promotion = "PNBRQK".find(letter.upper()) + 1
+    elif len(san) > 2 and san[-1] in "NBRQ" and san[-2].isdigit():
+        promotion = "PNBRQK".index(san[-1]) + 1
+        san = san[:-1]
+
+    if len(san) < 2 or san[-2] not in "abcdefgh" or san[-1] not in "12345678":
+        raise PGNError("cannot read move %r" % text)
+    target = square_name_to_square(san[-2:])
+    if san[0] in "NBRQK":
+        kind = "PNBRQK".index(san[0]) + 1
+        hint = san[1:-2]
+    else:
+        kind = PAWN
+        hint = san[:-2]
+    hint = hint.replace("x", "")
+
+    found = None
+    for move in legal:
+        src = move & 127
+        if (move >> 7) & 127 != target or board[src] & 7 != kind or move >> 16 != promotion:
+            continue
+        name = square_name(src)
+        if any(ch not in name for ch in hint):
+            continue
+        if found is not None:
+            raise PGNError("ambiguous move %r in %s" % (text, position.to_fen()))
+        found = move
+    if found is None:
+        raise PGNError("illegal move %r in %s" % (text, position.to_fen()))
+    return found
+
+
+def square_name_to_square(name):
+    return (8 - int(name[1])) * 16 + "abcdefgh".index(name[0])
+
+
+def read_games(lines):
+    """Yield (headers, move tokens) for each game in an iterable of PGN lines.
+
+    Only the current game is held in memory, so files of any size stream
+    through. Comments, variations and NAGs are dropped.
+    """
+    headers = {}
+    tokens = []
+    depth = 0        # variation nesting
+    comment = False  # inside a { ... } comment spanning lines
+    for line in lines:
+        if comment:
+            end = line.find("}")
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            comment = False
+        stripped = line.strip()
+        if stripped.startswith("[") and not depth:
+            if tokens:
+                yield headers, tokens
+                headers, tokens = {}, []
+            match = HEADER_RE.match(stripped)
+            if match:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"')
+            continue
+        if stripped.startswith("%"):
+            continue
+        for token in TOKEN_RE.findall(line):
+            if token[0] == "{":
+                comment = not token.endswith("}")
+            elif token[0] in ";$":
+                continue
+            elif token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+            elif not depth:
+                token = MOVE_NUMBER_RE.sub("", token)
+                if not token:
+                    continue
+                tokens.append(token)
+                if token in RESULTS:
+                    yield headers, tokens
+                    headers, tokens = {}, []
+    if tokens or headers:
+        yield headers, tokens
+
+
+def replay(headers, tokens):
+    """Play a game's moves from its start position, checking each one; returns the final Position."""
+    position = Position.from_fen(headers.get("FEN", START_FEN))
+    for ply, token in enumerate(tokens):
+        if token in RESULTS:
+            break
+        try:
+            position.make(parse_san(position, token))
+        except PGNError as error:
+            raise PGNError("ply %d: %s" % (ply + 1, error))
+    return position
+
+
+def write_pgn(position, headers=None, result="*"):
+    """PGN text for the game played so far in `position` (unmade back to its start to read it)."""
+    moves = [entry[0] for entry in position.stack]
+    start = position.copy()
+    while start.stack:
+        start.unmake()
+    headers = dict(headers or {})
+    fen = start.to_fen()
+    if fen != START_FEN:
+        headers.setdefault("SetUp", "1")
+        headers.setdefault("FEN", fen)
+    headers.setdefault("Result", result)
+
+    words = []
+    for move in moves:
+        if start.side != BLACK or not words:
+            words.append("%d.%s" % (start.fullmove, "" if start.side != BLACK else ".."))
+        words.append(move_to_san(start, move))
+        start.make(move)
+    words.append(result)
+
+    lines = ['[%s "%s"]' % (key, value.replace('"', '\\"')) for key, value in headers.items()]
+    lines.append("")
+    line = ""
+    for word in words:
+        if line and len(line) + 1 + len(word) > 79:
+            lines.append(line)
+            line = word
+        else:
+            line = line + " " + word if line else word
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def replay_file(path):
+    """Replay every game in a PGN file; returns (games, moves, errors)."""
+    games = moves = 0
+    errors = []
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        for headers, tokens in read_games(handle):
+            games += 1
+            try:
+                position = replay(headers, tokens)
+                moves += len(position.stack)
+            except (PGNError, ValueError) as error:
+                errors.append((games, headers.get("White", "?"), headers.get("Black", "?"), str(error)))
+    return games, moves, errors
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python chess_pgn.py games.pgn")
+    start = time.perf_counter()
+    games, moves, errors = replay_file(sys.argv[1])
+    elapsed = time.perf_counter() - start
+    for number, white, black, message in errors:
+        print("game %d (%s - %s): %s" % (number, white, black, message))
+    print("%d games, %d moves, %d invalid in %.2fs (%.0f games/min)"
+          % (games, moves, len(errors), elapsed, games * 60 / max(elapsed, 1e-9)))
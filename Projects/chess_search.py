@@ -0,0 +1,353 @@
+# chess_search.py
+# Computer opponent for Chess.py: alpha-beta search over chess_engine.Position
+
+import time
+from collections import namedtuple
+
+from chess_engine import (
+    PAWN, KING, WHITE, BLACK, SQUARES,
+    TranspositionTable,
+)
+from chess_tablebase import WIN, LOSS
+
+MATE = 100000
+INFINITY = MATE + 1
+MAX_PLY = 64
+
+VALUES = (0, 100, 320, 330, 500, 900, 0)
+
+# moves fit in 19 bits (promotion kind << 16), so ordering scores go above them
+SCORE_SHIFT = 19
+MOVE_MASK = (1 << SCORE_SHIFT) - 1
+
+# Piece-square tables from White's point of view, row 0 = rank 8.
+PAWN_TABLE = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+KNIGHT_TABLE = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+BISHOP_TABLE = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+ROOK_TABLE = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+)
+QUEEN_TABLE = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+KING_TABLE = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+)
+TABLES = (None, PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_TABLE)
+
+# PST[piece][sq]: material plus placement, positive for White and negative
+# for Black, so a position's score from White's side is a plain sum.
+PST = [[0] * 128 for _ in range(16)]
+for _kind in range(PAWN, KING + 1):
+    for _row in range(8):
+        for _col in range(8):
+            PST[WHITE | _kind][_row * 16 + _col] = VALUES[_kind] + TABLES[_kind][_row * 8 + _col]
+            PST[BLACK | _kind][_row * 16 + _col] = -(VALUES[_kind] + TABLES[_kind][(7 - _row) * 8 + _col])
+
+
+def evaluate(position):
+    """Static score in centipawns from the side to move's point of view."""
+    board = position.squares
+    score = 0
+    for sq in SQUARES:
+        piece = board[sq]
+        if piece:
+            score += PST[piece][sq]
+    return score if position.side == WHITE else -score
+
+
+SearchResult = namedtuple("SearchResult", "move score depth nodes elapsed")
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Engine(object):
+    """Iterative-deepening negamax with alpha-beta, quiescence and a time budget.
+
+    Moves are ordered TT move first, then captures by MVV-LVA, then killer
+    moves, then by the history heuristic. Move lists are kept in one
+    reusable buffer per ply so the search loop does not allocate them.
+
+    An optional opening book (chess_book.OpeningBook) and endgame tablebase
+    (chess_tablebase.Tablebase) are consulted first and answer without searching.
+    `evaluate` is the static evaluation, from the side to move's point of view.
+    """
+
+    def __init__(self, tt_size=1 << 18, book=None, tablebase=None, evaluate=evaluate):
+        self.tt = TranspositionTable(tt_size)
+        self.book = book
+        self.tablebase = tablebase
+        self.evaluate = evaluate
+        self.buffers = [[] for _ in range(MAX_PLY + 32)]
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * (16 * 128)
+        self.nodes = 0
+        self.deadline = 0.0
+        self.stop = None
+
+    def search(self, position, time_limit=1.0, max_depth=MAX_PLY - 1, stop=None):
+        """Best move for the side to move. `position` is searched in place and left unchanged.
+
+        `stop` is an optional threading.Event; setting it ends the search early
+        just like running out of time.
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.stop = stop
+        self.nodes = 0
+        self.tt.new_search()
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        self.history = [0] * (16 * 128)
+
+        root_moves = position.legal_moves()
+        if not root_moves:
+            return SearchResult(None, -MATE if position.safety()[0] else 0, 0, 0, 0.0)
+        known = self._lookup(position)
+        if known is not None:
+            move, score = known
+            return SearchResult(move, score, 0, 0, time.perf_counter() - start)
+        best = SearchResult(root_moves[0], 0, 0, 0, 0.0)
+        stack_depth = len(position.stack)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(position, depth, 0, -INFINITY, INFINITY)
+            except SearchTimeout:
+                while len(position.stack) > stack_depth:
+                    position.unmake()
+                break
+            entry = self.tt.probe(position.hash)
+            move = entry[3] if entry is not None and entry[3] else best.move
+            best = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            if abs(score) >= MATE - MAX_PLY or len(root_moves) == 1:
+                break
+            if time.perf_counter() >= start + time_limit / 2:
+                # the next iteration would almost certainly not finish
+                break
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _lookup(self, position):
+        """(move, score) from the book or tablebase, or None if neither knows the position."""
+        if self.book is not None:
+            move = self.book.pick(position)
+            if move is not None:
+                return move, 0
+        if self.tablebase is not None:
+            result = self.tablebase.probe(position)
+            if result is not None:
+                move = self.tablebase.best_move(position)
+                if move is not None:
+                    outcome, plies = result
+                    if outcome == WIN:
+                        return move, MATE - plies
+                    if outcome == LOSS:
+                        return move, -MATE + plies
+                    return move, 0
+        return None
+
+    def _out_of_time(self):
+        return time.perf_counter() > self.deadline or (self.stop is not None and self.stop.is_set())
+
+    def _order(self, position, moves, ply, tt_move):
+        # each move's score is packed above its bits in the ply's own buffer,
+        # so a plain in-place sort orders them without a key list or closure;
+        # the caller takes the move back out with & MOVE_MASK
+        board = position.squares
+        killers = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        history = self.history
+        values = VALUES
+        shift = SCORE_SHIFT
+        first, second = killers
+        for i, move in enumerate(moves):
+            if move == tt_move:
+                score = 1 << 30
+            else:
+                victim = board[(move >> 7) & 127]
+                if victim or move >> 16:
+                    score = (1 << 20) + values[victim & 7] * 16 + values[move >> 16] - (board[move & 127] & 7)
+                elif move == first:
+                    score = (1 << 19) + 1
+                elif move == second:
+                    score = 1 << 19
+                else:
+                    score = history[board[move & 127] << 7 | (move >> 7) & 127]
+            moves[i] = score << shift | move
+        moves.sort(reverse=True)
+
+    def _negamax(self, position, depth, ply, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 1023 and self._out_of_time():
+            raise SearchTimeout()
+
+        if ply and (position.halfmove >= 100 or position.repetitions()):
+            return 0
+
+        if ply >= MAX_PLY:
+            return self.evaluate(position)
+
+        in_check = position.safety()[0] > 0
+        if in_check:
+            depth += 1
+        if depth <= 0:
+            return self._quiesce(position, ply, alpha, beta)
+
+        tt = self.tt
+        key = position.hash
+        entry = tt.probe(key)
+        tt_move = 0
+        if entry is not None:
+            tt_move = entry[3]
+            if ply and entry[0] >= depth:
+                value = entry[2]
+                if value > MATE - MAX_PLY:
+                    value -= ply
+                elif value < -MATE + MAX_PLY:
+                    value += ply
+                bound = entry[1]
+                if (bound == TranspositionTable.EXACT or
+                        (bound == TranspositionTable.LOWER and value >= beta) or
+                        (bound == TranspositionTable.UPPER and value <= alpha)):
+                    return value
+
+        moves = self.buffers[ply]
+        del moves[:]
+        position.generate_moves(moves)
+        self._order(position, moves, ply, tt_move)
+
+        board = position.squares
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        legal = 0
+        for move in moves:
+            move &= MOVE_MASK
+            if not position.leaves_king_safe(move):
+                continue
+            legal += 1
+            quiet = not board[(move >> 7) & 127] and not move >> 16
+            piece = board[move & 127]
+            position.make(move)
+            score = -self._negamax(position, depth - 1, ply + 1, -beta, -alpha)
+            position.unmake()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if quiet and ply < MAX_PLY:
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                            self.history[piece << 7 | (move >> 7) & 127] += depth * depth
+                        break
+
+        if not legal:
+            return -MATE + ply if in_check else 0
+
+        if best_score >= beta:
+            bound = TranspositionTable.LOWER
+        elif best_score > original_alpha:
+            bound = TranspositionTable.EXACT
+        else:
+            bound = TranspositionTable.UPPER
+        stored = best_score
+        if stored > MATE - MAX_PLY:
+            stored += ply
+        elif stored < -MATE + MAX_PLY:
+            stored -= ply
+        tt.store(key, depth, bound, stored, best_move)
+        return best_score
+
+    def _quiesce(self, position, ply, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 1023 and self._out_of_time():
+            raise SearchTimeout()
+
+        stand_pat = self.evaluate(position)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        if ply >= len(self.buffers) - 1:
+            return stand_pat
+
+        board = position.squares
+        moves = self.buffers[ply]
+        del moves[:]
+        position.generate_moves(moves)
+        # keep captures and promotions, packed with their MVV-LVA score as in _order
+        values = VALUES
+        shift = SCORE_SHIFT
+        count = 0
+        for move in moves:
+            victim = board[(move >> 7) & 127]
+            if victim or move >> 16:
+                moves[count] = (values[victim & 7] * 16 + 8 - (board[move & 127] & 7)) << shift | move
+                count += 1
+        del moves[count:]
+        moves.sort(reverse=True)
+        for move in moves:
+            move &= MOVE_MASK
+            if not position.leaves_king_safe(move):
+                continue
+            position.make(move)
+            score = -self._quiesce(position, ply + 1, -beta, -alpha)
+            position.unmake()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
@@ -0,0 +1,233 @@
+# chess_selfplay.py
+# Headless engine-vs-engine matches over a process pool, for tuning chess_search
+#
+#   python chess_selfplay.py --games 40 --tc 5+0.1
+#   python chess_selfplay.py --games 100 --movetime 0.2 --workers 8 --pgn match.pgn
+#   python chess_selfplay.py --a eval=pst --b eval=material,tt=16 --games 40
+#
+# Each opening is played twice with colours swapped. Results are reported
+# from player A's point of view. Players A and B each take their own engine
+# settings (see PLAYER_DEFAULTS), so two configurations can be compared.
+# Endgame tables are built when a worker starts, before any clock runs.
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from chess_engine import BLACK, SQUARES, WHITE, Position
+from chess_pgn import START_FEN, parse_san, write_pgn
+from chess_search import MAX_PLY, VALUES, Engine, evaluate
+from chess_tablebase import Tablebase
+
+# short opening lines in SAN, played out from the start position
+OPENINGS = [
+    "e4 e5", "e4 c5", "e4 e6", "e4 c6", "d4 d5", "d4 Nf6", "c4 e5", "Nf3 d5",
+    "e4 e5 Nf3 Nc6", "d4 d5 c4 e6", "d4 Nf6 c4 g6", "e4 c5 Nf3 d6",
+]
+
+MAX_PLIES = 300
+
+# settings of one player; override with e.g. --a eval=material,tt=16,depth=6
+PLAYER_DEFAULTS = {"eval": "pst", "tt": 18, "depth": MAX_PLY - 1, "tablebase": 1}
+
+_tablebase = None  # one per worker process, built by init_worker
+
+
+def evaluate_material(position):
+    """Material only, no piece-square tables; from the side to move's point of view."""
+    board = position.squares
+    score = 0
+    for sq in SQUARES:
+        piece = board[sq]
+        if piece:
+            value = VALUES[piece & 7]
+            score += -value if piece & BLACK else value
+    return score if position.side == WHITE else -score
+
+
+EVALUATIONS = {"pst": evaluate, "material": evaluate_material}
+
+
+def parse_player(text):
+    """"key=value,..." over PLAYER_DEFAULTS -> settings dict; raises ValueError on bad input."""
+    player = dict(PLAYER_DEFAULTS)
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        key, _, value = item.partition("=")
+        if key not in player:
+            raise ValueError("unknown player setting %r (known: %s)" % (key, ", ".join(sorted(player))))
+        if key == "eval":
+            if value not in EVALUATIONS:
+                raise ValueError("unknown evaluation %r (known: %s)" % (value, ", ".join(sorted(EVALUATIONS))))
+            player[key] = value
+        else:
+            player[key] = int(value)
+    return player
+
+
+def init_worker(tablebase):
+    """Pool initializer: build the endgame tables once per worker, outside every clock."""
+    global _tablebase
+    if tablebase:
+        _tablebase = Tablebase()
+
+
+def make_engine(player):
+    return Engine(tt_size=1 << player["tt"], tablebase=_tablebase if player["tablebase"] else None,
+                  evaluate=EVALUATIONS[player["eval"]])
+
+
+def opening_fens(lines):
+    fens = []
+    for line in lines:
+        position = Position.from_fen(START_FEN)
+        for san in line.split():
+            position.make(parse_san(position, san))
+        fens.append(position.to_fen())
+    return fens
+
+
+def parse_time_control(text):
+    """"base+increment" in seconds, e.g. "10+0.1" -> (10.0, 0.1)."""
+    base, _, increment = text.partition("+")
+    return float(base), float(increment or 0)
+
+
+def play_game(job):
+    """Play one game; returns a dict with the result and search statistics."""
+    number, fen, a_is_white, settings = job
+    engines = {name: make_engine(settings["players"][name]) for name in ("A", "B")}
+    players = ("A", "B") if a_is_white else ("B", "A")  # (white, black)
+    clocks = [settings["base"], settings["base"]]
+    stats = {"A": [0, 0, 0.0, 0], "B": [0, 0, 0.0, 0]}  # depth sum, nodes, seconds, moves
+
+    position = Position.from_fen(fen)
+    result = reason = None
+    while result is None:
+        side = 0 if position.turn == "white" else 1
+        name = players[side]
+        if not position.has_legal_move():
+            if position.safety()[0]:
+                result, reason = ("0-1" if side == 0 else "1-0"), "checkmate"
+            else:
+                result, reason = "1/2-1/2", "stalemate"
+            break
+        if position.is_threefold_repetition():
+            result, reason = "1/2-1/2", "repetition"
+            break
+        if position.is_fifty_move_draw():
+            result, reason = "1/2-1/2", "fifty moves"
+            break
+        if len(position.stack) >= MAX_PLIES:
+            result, reason = "1/2-1/2", "move limit"
+            break
+
+        if settings["movetime"]:
+            budget = settings["movetime"]
+        else:
+            budget = min(clocks[side] / 30 + settings["increment"], clocks[side] / 2)
+        start = time.perf_counter()
+        search = engines[name].search(position, budget, settings["players"][name]["depth"])
+        elapsed = time.perf_counter() - start
+        if not settings["movetime"]:
+            clocks[side] += settings["increment"] - elapsed
+            if clocks[side] < 0:
+                result, reason = ("0-1" if side == 0 else "1-0"), "time"
+                break
+        record = stats[name]
+        record[0] += search.depth
+        record[1] += search.nodes
+        record[2] += search.elapsed
+        record[3] += 1
+        position.make(search.move)
+
+    score = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}[result]
+    return {
+        "number": number,
+        "result": result,
+        "reason": reason,
+        "score_a": score if a_is_white else 1.0 - score,
+        "plies": len(position.stack),
+        "stats": stats,
+        "pgn": write_pgn(position, {"Event": "selfplay", "Round": str(number),
+                                    "White": players[0], "Black": players[1]}, result)
+        if settings["pgn"] else None,
+    }
+
+
+def run_match(games, workers, settings, fens):
+    jobs = []
+    for number in range(games):
+        fen = fens[(number // 2) % len(fens)]
+        jobs.append((number + 1, fen, number % 2 == 0, settings))
+
+    totals = {"A": [0, 0, 0.0, 0], "B": [0, 0, 0.0, 0]}
+    wins = draws = losses = 0
+    reasons = {}
+    pgn_games = []
+    start = time.perf_counter()
+    tablebase = any(player["tablebase"] for player in settings["players"].values())
+    with multiprocessing.Pool(workers, init_worker, (tablebase,)) as pool:
+        for game in pool.imap_unordered(play_game, jobs):
+            if game["score_a"] == 1.0:
+                wins += 1
+            elif game["score_a"] == 0.0:
+                losses += 1
+            else:
+                draws += 1
+            reasons[game["reason"]] = reasons.get(game["reason"], 0) + 1
+            for name in totals:
+                for i in range(4):
+                    totals[name][i] += game["stats"][name][i]
+            if game["pgn"]:
+                pgn_games.append((game["number"], game["pgn"]))
+            print("game %3d: %-7s %-12s %d plies" % (game["number"], game["result"], game["reason"], game["plies"]))
+    elapsed = time.perf_counter() - start
+
+    print("\nA vs B: +%d =%d -%d  (score %.1f%%)" % (wins, draws, losses, 100.0 * (wins + draws / 2.0) / max(games, 1)))
+    print("endings: " + ", ".join("%s %d" % item for item in sorted(reasons.items())))
+    for name, (depth, nodes, seconds, moves) in sorted(totals.items()):
+        print("%s: avg depth %.2f, %.0f nps over %d moves"
+              % (name, depth / max(moves, 1), nodes / max(seconds, 1e-9), moves))
+    print("%d games in %.1fs on %d workers (%.1f games/min)" % (games, elapsed, workers, games * 60 / max(elapsed, 1e-9)))
+    return wins, draws, losses, pgn_games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine self-play match for chess_search")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tc", default="10+0.1", help="time control per side, base+increment seconds")
+    parser.add_argument("--movetime", type=float, default=0.0, help="fixed seconds per move (overrides --tc)")
+    parser.add_argument("--openings", help="file of FENs, one per line (default: built-in opening lines)")
+    parser.add_argument("--no-tablebase", action="store_true", help="neither player uses the KQK/KRK/KPK tables")
+    parser.add_argument("--a", default="", help="player A settings, e.g. eval=material,tt=16,depth=6,tablebase=0")
+    parser.add_argument("--b", default="", help="player B settings, same keys as --a")
+    parser.add_argument("--pgn", help="write the games to this PGN file")
+    args = parser.parse_args()
+
+    if args.openings:
+        with open(args.openings) as handle:
+            fens = [line.strip() for line in handle if line.strip()]
+    else:
+        fens = opening_fens(OPENINGS)
+    base, increment = parse_time_control(args.tc)
+    players = {}
+    for name, text in (("A", args.a), ("B", args.b)):
+        try:
+            players[name] = parse_player(text)
+        except ValueError as error:
+            parser.error("--%s: %s" % (name.lower(), error))
+        if args.no_tablebase:
+            players[name]["tablebase"] = 0
+    settings = {"base": base, "increment": increment, "movetime": args.movetime,
+                "players": players, "pgn": bool(args.pgn)}
+    _, _, _, pgn_games = run_match(args.games, args.workers, settings, fens)
+    if args.pgn:
+        with open(args.pgn, "w", encoding="utf-8") as out:
+            for _, text in sorted(pgn_games):
+                out.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
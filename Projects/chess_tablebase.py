@@ -0,0 +1,315 @@
+# chess_tablebase.py
+# Endgame tablebases for KQK, KRK and KPK, generated in-process
+#
+# Each table is built once by retrograde analysis: start from the checkmates
+# and walk backwards one ply at a time, so every won position gets its exact
+# distance to mate. Building takes a few seconds per table, so a Tablebase
+# builds them up front (or on a background thread) and a probe never waits:
+# until a table is ready, positions it covers are reported as not covered. Tables are stored for the strong side as
+# White; a position where Black has the extra piece is probed colour-flipped.
+#
+# Squares here are 0..63 (row * 8 + col, row 0 = rank 8) and a position is
+# indexed as white king * 4096 + black king * 64 + extra piece. A table is an
+# array of 2 * 64**3 unsigned shorts, White to move first, holding
+# plies-to-mate + 1 for positions White wins and 0 for draws.
+
+import threading
+from array import array
+
+from chess_engine import (
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BLACK, SQUARES,
+)
+
+SIZE = 64 * 64 * 64
+
+WIN, DRAW, LOSS = 1, 0, -1
+
+KING_STEPS = [[] for _ in range(64)]
+ROOK_RAYS = [[] for _ in range(64)]
+BISHOP_RAYS = [[] for _ in range(64)]
+for _sq in range(64):
+    _r, _c = _sq >> 3, _sq & 7
+    for _dr in (-1, 0, 1):
+        for _dc in (-1, 0, 1):
+            if not (_dr or _dc):
+                continue
+            if 0 <= _r + _dr < 8 and 0 <= _c + _dc < 8:
+                KING_STEPS[_sq].append((_r + _dr) * 8 + _c + _dc)
+            ray = []
+            rr, cc = _r + _dr, _c + _dc
+            while 0 <= rr < 8 and 0 <= cc < 8:
+                ray.append(rr * 8 + cc)
+                rr += _dr
+                cc += _dc
+            if ray:
+                (ROOK_RAYS if not (_dr and _dc) else BISHOP_RAYS)[_sq].append(ray)
+QUEEN_RAYS = [ROOK_RAYS[_sq] + BISHOP_RAYS[_sq] for _sq in range(64)]
+RAYS = {ROOK: ROOK_RAYS, QUEEN: QUEEN_RAYS}
+
+ADJACENT = bytearray(64 * 64)
+for _sq in range(64):
+    for _to in KING_STEPS[_sq]:
+        ADJACENT[_sq * 64 + _to] = 1
+
+# BETWEEN[a * 64 + b]: squares strictly between a and b if they share a rank,
+# file or diagonal, else None. LINE_KIND tells which: ROOK or BISHOP.
+BETWEEN = [None] * (64 * 64)
+LINE_KIND = bytearray(64 * 64)
+for _sq in range(64):
+    for _kind, _rays in ((ROOK, ROOK_RAYS), (BISHOP, BISHOP_RAYS)):
+        for _ray in _rays[_sq]:
+            for _i, _to in enumerate(_ray):
+                BETWEEN[_sq * 64 + _to] = frozenset(_ray[:_i])
+                LINE_KIND[_sq * 64 + _to] = _kind
+
+# the 8 symmetries of the board, as square maps
+TRANSFORMS = []
+for _flip_r in (False, True):
+    for _flip_c in (False, True):
+        for _swap in (False, True):
+            _map = []
+            for _sq in range(64):
+                _r, _c = _sq >> 3, _sq & 7
+                if _swap:
+                    _r, _c = _c, _r
+                if _flip_r:
+                    _r = 7 - _r
+                if _flip_c:
+                    _c = 7 - _c
+                _map.append(_r * 8 + _c)
+            TRANSFORMS.append(_map)
+# for each white king square, the symmetries that send it to its smallest image
+BEST_TRANSFORMS = []
+for _sq in range(64):
+    _low = min(_t[_sq] for _t in TRANSFORMS)
+    BEST_TRANSFORMS.append([_t for _t in TRANSFORMS if _t[_sq] == _low])
+MIRROR = [(_sq & 56) | (7 - (_sq & 7)) for _sq in range(64)]
+
+
+def canonical_piece(w, b, x):
+    """Smallest index among the 8 symmetric images (queen and rook tables)."""
+    return min(t[w] * 4096 + t[b] * 64 + t[x] for t in BEST_TRANSFORMS[w])
+
+
+def canonical_pawn(w, b, x):
+    """Pawn tables only have the left-right mirror; put the pawn on files a-d."""
+    if x & 7 > 3:
+        return MIRROR[w] * 4096 + MIRROR[b] * 64 + MIRROR[x]
+    return w * 4096 + b * 64 + x
+
+
+def attacks(kind, x, target, w):
+    """True if White's extra piece on `x` attacks `target`, with the white king on `w` as the only blocker."""
+    if kind == PAWN:
+        return target >> 3 == (x >> 3) - 1 and abs((target & 7) - (x & 7)) == 1
+    between = BETWEEN[x * 64 + target]
+    if between is None:
+        return False
+    if kind == ROOK and LINE_KIND[x * 64 + target] != ROOK:
+        return False
+    return w not in between
+
+
+def black_moves(kind, w, b, x):
+    """Squares the black king may move to; a move onto `x` is a capture."""
+    moves = []
+    for to in KING_STEPS[b]:
+        if to == w or ADJACENT[to * 64 + w]:
+            continue
+        if to == x:
+            if not ADJACENT[x * 64 + w]:
+                moves.append(to)
+            continue
+        if not attacks(kind, x, to, w):
+            moves.append(to)
+    return moves
+
+
+def white_retractions(kind, w, b, x):
+    """Positions (White to move) from which one white move reaches (w, b, x)."""
+    for frm in KING_STEPS[w]:
+        if frm != b and frm != x and not ADJACENT[frm * 64 + b]:
+            yield frm, b, x
+    if kind == PAWN:
+        back = x + 8
+        if back < 56 and back != w and back != b:
+            yield w, b, back
+            if x >> 3 == 4 and back + 8 != w and back + 8 != b:
+                yield w, b, back + 8
+        return
+    for ray in RAYS[kind][x]:
+        for frm in ray:
+            if frm == w or frm == b:
+                break
+            yield w, b, frm
+
+
+def build(kind, promotion_tables=None):
+    """Retrograde analysis for K + `kind` vs K; returns the table array."""
+    canonical = canonical_pawn if kind == PAWN else canonical_piece
+    table = array("H", bytes(4 * SIZE))
+    black_base = SIZE
+
+    def legal(w, b, x):
+        if w == b or w == x or b == x or ADJACENT[w * 64 + b]:
+            return False
+        return kind != PAWN or 8 <= x < 56
+
+    # seeds: checkmates (black to move, no moves, in check) and, for pawns,
+    # wins by promoting into an already solved queen or rook ending
+    mates = []
+    promotions = {}
+    for w in range(64):
+        for b in range(64):
+            if w == b or ADJACENT[w * 64 + b]:
+                continue
+            for x in range(64):
+                if not legal(w, b, x) or canonical(w, b, x) != w * 4096 + b * 64 + x:
+                    continue
+                if attacks(kind, x, b, w) and not black_moves(kind, w, b, x):
+                    mates.append(w * 4096 + b * 64 + x)
+                if kind == PAWN and x >> 3 == 1 and x - 8 != w and x - 8 != b \
+                        and not attacks(kind, x, b, w):
+                    best = 0
+                    for promoted, promoted_table in promotion_tables:
+                        value = promoted_table[black_base + canonical_piece(w, b, x - 8)]
+                        if value and (not best or value < best):
+                            best = value
+                    if best:
+                        promotions.setdefault(best, []).append(w * 4096 + b * 64 + x)
+
+    for idx in mates:
+        table[black_base + idx] = 1
+    losses = mates
+    plies = 0
+    while losses or any(level > plies for level in promotions):
+        # White to move, mates in plies + 1
+        wins = []
+        for idx in losses:
+            w, b, x = idx >> 12, (idx >> 6) & 63, idx & 63
+            for pw, pb, px in white_retractions(kind, w, b, x):
+                pred = canonical(pw, pb, px)
+                if not table[pred] and legal(pw, pb, px) and not attacks(kind, px, pb, pw):
+                    table[pred] = plies + 2
+                    wins.append(pred)
+        for idx in promotions.pop(plies + 1, ()):
+            if not table[idx]:
+                table[idx] = plies + 2
+                wins.append(idx)
+
+        # Black to move, mated in plies + 2: every black move must reach a win
+        losses = []
+        for idx in wins:
+            w, b, x = idx >> 12, (idx >> 6) & 63, idx & 63
+            for frm in KING_STEPS[b]:
+                if frm == w or frm == x or ADJACENT[frm * 64 + w]:
+                    continue
+                pred = canonical(w, frm, x)
+                if table[black_base + pred]:
+                    continue
+                pw, pb, px = pred >> 12, (pred >> 6) & 63, pred & 63
+                moves = black_moves(kind, pw, pb, px)
+                if not moves or px in moves:
+                    continue
+                if all(table[canonical(pw, to, px)] for to in moves):
+                    table[black_base + pred] = plies + 3
+                    losses.append(pred)
+        plies += 2
+    return table
+
+
+class Tablebase(object):
+    """Probes KQK, KRK and KPK.
+
+    With background=True the tables are built on a daemon thread and probes
+    answer None until each is ready; otherwise they are all built before the
+    constructor returns.
+    """
+
+    KINDS = (QUEEN, ROOK, PAWN)  # KPK promotes into the other two, so it comes last
+
+    def __init__(self, background=False):
+        self.tables = {}
+        self.done = threading.Event()
+        if background:
+            threading.Thread(target=self.build_all, daemon=True).start()
+        else:
+            self.build_all()
+
+    def build_all(self):
+        for kind in self.KINDS:
+            if kind not in self.tables:
+                promotions = [(QUEEN, self.tables[QUEEN]), (ROOK, self.tables[ROOK])] if kind == PAWN else None
+                self.tables[kind] = build(kind, promotions)
+        self.done.set()
+
+    def ready(self, kind=None):
+        """True once the table for `kind` (or every table) has been built."""
+        return self.done.is_set() if kind is None else kind in self.tables
+
+    def probe(self, position):
+        """(outcome, plies) for the side to move, or None if the position is not covered.
+
+        outcome is WIN, DRAW or LOSS; plies counts half-moves to mate.
+        """
+        board = position.squares
+        extra = []
+        kings = {}
+        for sq in SQUARES:
+            piece = board[sq]
+            if not piece:
+                continue
+            if piece & 7 == KING:
+                kings[piece & BLACK] = sq
+            else:
+                extra.append((piece, sq))
+                if len(extra) > 1:
+                    return None
+        if not extra:
+            return DRAW, 0
+        piece, sq = extra[0]
+        kind = piece & 7
+        if kind == KNIGHT or kind == BISHOP:
+            return DRAW, 0
+        strong = piece & BLACK
+
+        def index(sq0x88):
+            row, col = sq0x88 >> 4, sq0x88 & 7
+            if strong == BLACK:
+                row = 7 - row
+            return row * 8 + col
+
+        w, b, x = index(kings[strong]), index(kings[strong ^ BLACK]), index(sq)
+        if kind == PAWN and not 8 <= x < 56:
+            return None
+        canonical = canonical_pawn if kind == PAWN else canonical_piece
+        table = self.tables.get(kind)
+        if table is None:
+            return None
+        strong_to_move = position.side == strong
+        value = table[(0 if strong_to_move else SIZE) + canonical(w, b, x)]
+        if not value:
+            return DRAW, 0
+        return (WIN if strong_to_move else LOSS), value - 1
+
+    def best_move(self, position):
+        """The move that mates fastest, resists longest or holds the draw; None if not covered."""
+        best = None
+        best_score = None
+        for move in position.legal_moves():
+            position.make(move)
+            result = self.probe(position)
+            position.unmake()
+            if result is None:
+                return None
+            outcome, plies = result
+            # outcome is from the opponent's point of view after the move
+            if outcome == LOSS:
+                score = 1000 - plies
+            elif outcome == WIN:
+                score = -1000 + plies
+            else:
+                score = 0
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        return best
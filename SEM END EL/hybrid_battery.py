@@ -0,0 +1,158 @@
+# hybrid_battery.py
+# Pluggable battery models for hybrid_sim, all run over (rows x time) arrays
+#
+#   python hybrid_battery.py          compare the models over a year and check against the step loop
+#
+# A model has run(p_net, dt, capacity, initial_wh) -> (soc_wh, end capacity),
+# short_steps(...) -> unmet-load mask, and power/delta giving the energy it
+# exchanges at its terminals and the SOC change that buys; pass one as `battery=` to
+# hybrid_sim.simulate, hybrid_ensemble.run_ensemble or hybrid_sizing.evaluate.
+# Capacities and starting charges may be scalars or one value per row.
+
+import time
+
+import numpy as np
+
+from hybrid_sim import per_row, previous_soc, soc_delta, soc_path, soc_series, solar_profile, time_axis, wind_profile
+
+
+class IdealBattery(object):
+    """The EL scripts' battery: one controller efficiency both ways, clipped at empty and full."""
+
+    def __init__(self, controller_eff=0.90):
+        self.controller_eff = controller_eff
+
+    def power(self, p_net, capacity):
+        """Power the battery actually exchanges at its terminals for a net power offered (+) or asked (-)."""
+        return np.asarray(p_net, dtype=float)
+
+    def delta(self, p_net, dt, capacity):
+        """Energy into (+) or out of (-) the battery for each step, before clipping."""
+        return soc_delta(p_net, dt, self.controller_eff)
+
+    def run(self, p_net, dt, capacity, initial_wh):
+        return soc_path(self.delta(p_net, dt, capacity), capacity, initial_wh), capacity
+
+    def short_steps(self, p_net, soc_wh, dt, capacity, initial_wh):
+        return previous_soc(soc_wh, initial_wh) + self.delta(p_net, dt, capacity) < 0
+
+
+class LeadAcidBattery(IdealBattery):
+    """A lead-acid bank with power limits, rate and SOC dependent losses, and capacity fade.
+
+    - charge and discharge power are capped at max_charge_c and
+      max_discharge_c times the nameplate capacity (C-rate limits); load
+      beyond the discharge cap goes unmet
+    - efficiency falls by rate_loss per 1C of charge or discharge rate
+    - above taper_soc, the share of offered charge the battery accepts falls
+      linearly to taper_floor at full (the absorption phase)
+    - capacity fades by fade_per_cycle for every equivalent full cycle of
+      throughput, updated every block_h hours
+
+    The taper depends on the SOC the step starts from, which a prefix scan
+    cannot express directly, so each block is solved by `passes` rounds of
+    fixed-point iteration: scan, work out the taper from that SOC path, scan
+    again. run_loop is the exact per-step version to measure that against.
+    """
+
+    def __init__(self, controller_eff=0.90, max_charge_c=0.2, max_discharge_c=0.5, rate_loss=0.05,
+                 taper_soc=0.8, taper_floor=0.3, fade_per_cycle=2e-4, block_h=24, passes=6):
+        IdealBattery.__init__(self, controller_eff)
+        self.max_charge_c = max_charge_c
+        self.max_discharge_c = max_discharge_c
+        self.rate_loss = rate_loss
+        self.taper_soc = taper_soc
+        self.taper_floor = taper_floor
+        self.fade_per_cycle = fade_per_cycle
+        self.block_h = block_h
+        self.passes = passes
+
+    def power(self, p_net, capacity):
+        """p_net within the C-rate caps."""
+        capacity = per_row(capacity)
+        return np.clip(p_net, -self.max_discharge_c * capacity, self.max_charge_c * capacity)
+
+    def delta(self, p_net, dt, capacity):
+        """Energy change per step after the C-rate caps and rate-dependent losses, before the taper."""
+        power = self.power(p_net, capacity)
+        capacity = per_row(capacity)
+        eff = np.maximum(self.controller_eff - self.rate_loss * np.abs(power) / capacity, 0.5)
+        energy = power * dt
+        return np.where(power > 0, energy * eff, energy / eff)
+
+    def acceptance(self, soc_fraction):
+        """Share of the offered charge taken at a given SOC (1 below taper_soc)."""
+        over = np.clip((soc_fraction - self.taper_soc) / (1.0 - self.taper_soc), 0.0, 1.0)
+        return 1.0 - (1.0 - self.taper_floor) * over
+
+    def run(self, p_net, dt, capacity, initial_wh):
+        p_net = np.asarray(p_net, dtype=float)
+        rows = p_net.shape[:-1]
+        delta = self.delta(p_net, dt, capacity)
+        capacity = np.array(np.broadcast_to(capacity, rows), dtype=float)
+        start = np.minimum(np.array(np.broadcast_to(initial_wh, rows), dtype=float), capacity)
+        soc_wh = np.empty(p_net.shape)
+        block = max(1, int(round(self.block_h / dt)))
+        for begin in range(0, p_net.shape[-1], block):
+            part = delta[..., begin:begin + block]
+            charging = part > 0
+            soc = soc_series(part, capacity, start)
+            for _ in range(self.passes):
+                taper = self.acceptance(previous_soc(soc, start) / per_row(capacity))
+                soc = soc_series(np.where(charging, part * taper, part), capacity, start)
+            soc_wh[..., begin:begin + block] = soc
+            # equivalent full cycles: energy moved in and out over twice the capacity
+            moved = np.abs(soc - previous_soc(soc, start)).sum(axis=-1)
+            capacity = capacity * (1.0 - self.fade_per_cycle * moved / (2.0 * capacity))
+            start = np.minimum(soc[..., -1], capacity)
+        return soc_wh, capacity
+
+    def run_loop(self, p_net, dt, capacity, initial_wh):
+        """run() for one row, one step at a time with the exact taper."""
+        delta = self.delta(p_net, dt, capacity).tolist()
+        capacity = float(capacity)
+        current = min(float(initial_wh), capacity)
+        soc_wh = np.empty(len(delta))
+        block = max(1, int(round(self.block_h / dt)))
+        moved = 0.0
+        for i, step in enumerate(delta):
+            if step > 0:
+                step *= float(self.acceptance(current / capacity))
+            new = min(max(current + step, 0.0), capacity)
+            moved += abs(new - current)
+            current = soc_wh[i] = new
+            if (i + 1) % block == 0 or i + 1 == len(delta):
+                capacity *= 1.0 - self.fade_per_cycle * moved / (2.0 * capacity)
+                current = min(current, capacity)
+                moved = 0.0
+        return soc_wh, capacity
+
+    def short_steps(self, p_net, soc_wh, dt, capacity, initial_wh):
+        """Steps where the load exceeded the discharge cap or the battery ran empty."""
+        over_limit = np.asarray(p_net) < -self.max_discharge_c * per_row(capacity)
+        return over_limit | (previous_soc(soc_wh, initial_wh) + self.delta(p_net, dt, capacity) < 0)
+
+
+if __name__ == "__main__":
+    from hybrid_sim import Params, capacity_wh, short_steps, simulate
+
+    rng = np.random.default_rng(42)
+    hours, dt = time_axis(365, 15)
+    wind = wind_profile(hours, rng=rng)
+    sun = solar_profile(hours, rng=rng)
+    params = Params(load_w=45, battery_ah=60)
+    capacity = float(capacity_wh(params))
+    for name, battery in (("ideal", None), ("lead-acid", LeadAcidBattery())):
+        start = time.perf_counter()
+        result = simulate(wind, sun, dt, params, battery=battery)
+        elapsed = time.perf_counter() - start
+        short = short_steps(result, dt, params, battery=battery)
+        print(f"{name:10s} {elapsed:.3f}s  mean SOC {100 * result.soc_wh.mean() / capacity:.1f}%  "
+              f"unmet {short.sum() * dt:.1f} h  end capacity {float(result.capacity_wh):.1f} Wh")
+
+    battery = LeadAcidBattery()
+    result = simulate(wind, sun, dt, params, battery=battery)
+    start = time.perf_counter()
+    exact, end = battery.run_loop(result.p_net, dt, capacity, 0.5 * capacity)
+    print(f"step loop {time.perf_counter() - start:.2f}s, max SOC difference "
+          f"{np.abs(exact - result.soc_wh).max():.2e} Wh, capacity difference {abs(end - result.capacity_wh):.2e} Wh")
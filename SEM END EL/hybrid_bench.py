@@ -0,0 +1,198 @@
+# hybrid_bench.py
+# Scaling benchmark for the hybrid model: wall time, peak memory and steps/s from 96 to 10^7 steps
+#
+#   python hybrid_bench.py                                  every case, results to hybrid_bench.json
+#   python hybrid_bench.py --max-steps 100000 --out quick.csv
+#   python hybrid_bench.py --baseline hybrid_bench.json     exit 1 if any case got slower
+#
+# Three axes are measured, each at sizes growing by about 10x:
+#   steps      one series of `size` steps: the EL step loop (simulate_loop),
+#              simulate(), and the SOC kernels on their own
+#   scenarios  run_ensemble with `size` one-day scenarios
+#   designs    hybrid_sizing.evaluate_all over `size` designs for one day
+# A case is skipped when it would simulate more than --max-steps steps in
+# total; the step loop stops at --loop-max-steps since it alone takes minutes
+# at 10^7. Time is the best of --repeat runs; peak memory is taken from one
+# more run under tracemalloc (NumPy reports its buffers to it), so tracing
+# does not slow the timed runs.
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from hybrid_ensemble import run_ensemble
+from hybrid_sim import (
+    Params, capacity_wh, simulate, simulate_loop, soc_blocked, soc_delta, soc_loop, soc_series,
+    solar_profile, time_axis, wind_profile,
+)
+from hybrid_sizing import evaluate_all, grid
+
+STEP_SIZES = (96, 1000, 10000, 100000, 1000000, 10000000)
+SCENARIO_SIZES = (10, 100, 1000, 10000, 100000)
+DESIGN_POINTS = (3, 5, 10, 22, 47)  # grid points per variable: 27 ... 103,823 designs
+
+FIELDS = ("case", "axis", "size", "steps", "seconds", "peak_mb", "steps_per_s")
+
+
+def weather(steps, step_minutes=15, seed=42):
+    rng = np.random.default_rng(seed)
+    hours = np.arange(steps) * (step_minutes / 60.0)
+    return wind_profile(hours, rng=rng), solar_profile(hours, rng=rng), step_minutes / 60.0
+
+
+def series_cases(steps):
+    """(name, function) pairs over one series of `steps` steps, inputs made up front."""
+    wind, sun, dt = weather(steps)
+    params = Params()
+    capacity = float(capacity_wh(params))
+    delta = soc_delta(simulate(wind, sun, dt, params).p_net, dt)
+    return [
+        ("simulate_loop", lambda: simulate_loop(wind, sun, dt, params)),
+        ("simulate", lambda: simulate(wind, sun, dt, params)),
+        ("soc_loop", lambda: soc_loop(delta, capacity, 0.5 * capacity)),
+        ("soc_series", lambda: soc_series(delta, capacity, 0.5 * capacity)),
+        ("soc_blocked", lambda: soc_blocked(delta, capacity, 0.5 * capacity)),
+    ]
+
+
+def measure(function, repeat=3):
+    """(best wall time in s, peak traced memory in MB) of calling `function`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20
+
+
+def plan(max_steps=10 ** 7, loop_max_steps=10 ** 6, workers=1):
+    """Every case within the limits as (case, axis, size, total steps, make), make() -> function."""
+    day = len(time_axis(1, 15)[0])
+    cases = []
+    for size in STEP_SIZES:
+        if size > max_steps:
+            continue
+        for index, name in enumerate(("simulate_loop", "simulate", "soc_loop", "soc_series", "soc_blocked")):
+            if name.endswith("_loop") and size > loop_max_steps:
+                continue
+            cases.append((name, "steps", size, size,
+                          lambda size=size, index=index: series_cases(size)[index][1]))
+    for size in SCENARIO_SIZES:
+        if size * day <= max_steps:
+            cases.append(("run_ensemble", "scenarios", size, size * day,
+                          lambda size=size: lambda: run_ensemble(size, days=1, workers=workers)))
+    wind, sun, dt = weather(day)
+    for points in DESIGN_POINTS:
+        if points ** 3 * day <= max_steps:
+            cases.append(("evaluate_all", "designs", points ** 3, points ** 3 * day,
+                          lambda points=points: lambda: evaluate_all(grid(points), wind, sun, dt, workers=workers)))
+    return cases
+
+
+def run(max_steps=10 ** 7, loop_max_steps=10 ** 6, repeat=3, workers=1, only=None, log=None):
+    """Measure every planned case (or those named in `only`); returns a list of result dicts."""
+    results = []
+    for name, axis, size, steps, make in plan(max_steps, loop_max_steps, workers):
+        if only and name not in only:
+            continue
+        seconds, peak_mb = measure(make(), repeat if steps < 10 ** 6 else 1)
+        record = {"case": name, "axis": axis, "size": size, "steps": steps, "seconds": seconds,
+                  "peak_mb": peak_mb, "steps_per_s": steps / seconds}
+        results.append(record)
+        if log:
+            log(record)
+    return results
+
+
+def environment():
+    return {"python": sys.version.split()[0], "numpy": np.__version__, "machine": platform.machine(),
+            "processor": platform.processor(), "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def save(path, results):
+    """Write results as CSV if `path` ends in .csv, JSON (with the environment) otherwise."""
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as out:
+            writer = csv.DictWriter(out, FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w") as out:
+            json.dump({"environment": environment(), "results": results}, out, indent=1)
+
+
+def load(path):
+    if path.endswith(".csv"):
+        with open(path, newline="") as source:
+            return [dict(row, size=int(row["size"]), steps=int(row["steps"]), seconds=float(row["seconds"]),
+                         peak_mb=float(row["peak_mb"]), steps_per_s=float(row["steps_per_s"]))
+                    for row in csv.DictReader(source)]
+    with open(path) as source:
+        return json.load(source)["results"]
+
+
+def regressions(results, baseline, slowdown=1.5, min_seconds=0.01):
+    """(record, old seconds) for cases more than `slowdown` times slower than in `baseline`.
+
+    Cases under `min_seconds` in both runs are ignored: at that length the
+    timing is mostly noise.
+    """
+    old = {(record["case"], record["size"]): record["seconds"] for record in baseline}
+    slower = []
+    for record in results:
+        before = old.get((record["case"], record["size"]))
+        if before is None or max(before, record["seconds"]) < min_seconds:
+            continue
+        if record["seconds"] > slowdown * before:
+            slower.append((record, before))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the hybrid wind-solar model")
+    parser.add_argument("--out", default="hybrid_bench.json", help="results file, .json or .csv")
+    parser.add_argument("--max-steps", type=float, default=1e7, help="largest total number of steps per case")
+    parser.add_argument("--loop-max-steps", type=float, default=1e6, help="largest size for the step loops")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case below 10^6 steps")
+    parser.add_argument("--workers", type=int, default=1, help="pool size for the ensemble and sweep cases")
+    parser.add_argument("--case", action="append", help="only this case (repeatable)")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--slowdown", type=float, default=1.5, help="slower than baseline by this factor fails")
+    args = parser.parse_args()
+
+    print(f"{'case':14s} {'axis':10s} {'size':>9s} {'steps':>10s} {'time (s)':>10s} {'peak MB':>9s} {'steps/s':>14s}")
+
+    def log(record):
+        print(f"{record['case']:14s} {record['axis']:10s} {record['size']:9d} {record['steps']:10d} "
+              f"{record['seconds']:10.4f} {record['peak_mb']:9.1f} {record['steps_per_s']:14,.0f}", flush=True)
+
+    results = run(int(args.max_steps), int(args.loop_max_steps), args.repeat, args.workers, args.case, log)
+    save(args.out, results)
+    print(f"wrote {len(results)} results to {args.out}")
+
+    if args.baseline:
+        slower = regressions(results, load(args.baseline), args.slowdown)
+        for record, before in slower:
+            print(f"REGRESSION {record['case']} size {record['size']}: "
+                  f"{before:.4f}s -> {record['seconds']:.4f}s ({record['seconds'] / before:.2f}x)")
+        if slower:
+            sys.exit(1)
+        print(f"no case slower than {args.slowdown}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
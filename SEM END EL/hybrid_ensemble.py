@@ -0,0 +1,167 @@
+# hybrid_ensemble.py
+# Monte Carlo ensembles of the hybrid model: thousands of weather realisations at once
+#
+#   python hybrid_ensemble.py                      2000 one-day scenarios like EL2
+#   python hybrid_ensemble.py --scenarios 20000 --days 7 --workers 4
+#
+# Scenarios are simulated as (scenario x time) arrays through hybrid_sim. A run
+# too big for one array is cut into batches of rows that fit `max_mb`, and the
+# batches go to a process pool. Each batch draws its weather from its own seed
+# spawned from the master seed, so results do not depend on the worker count.
+
+import argparse
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from hybrid_battery import LeadAcidBattery
+from hybrid_sim import (
+    Params, capacity_wh, short_steps, simulate, solar_profile, time_axis, wind_profile,
+)
+
+# float64 arrays of (rows x steps) alive at once while a batch is simulated
+ARRAYS_PER_ROW = 12
+
+SOC_BINS = 200  # SOC histogram bins, so percentiles resolve 0.5% of capacity
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+EnsembleResult = namedtuple("EnsembleResult", [
+    "scenarios",          # number of weather realisations
+    "loss_of_load",       # probability that a scenario has a step the battery cannot cover
+    "lole_fraction",      # mean fraction of steps with unmet load
+    "below_probability",  # probability that SOC goes under the threshold at least once
+    "percentile_hours",   # start time of each percentile bucket
+    "soc_percentiles",    # {percentile: SOC % in each bucket}
+    "hours_below",        # per scenario: hours spent under the threshold
+    "min_soc",            # per scenario: lowest SOC in %
+    "final_soc",          # per scenario: SOC in % after the last step
+])
+
+
+def batch_rows(steps, max_mb):
+    """Scenarios per batch so one batch stays within `max_mb` megabytes."""
+    return max(1, int(max_mb * 2 ** 20 // (steps * 8 * ARRAYS_PER_ROW)))
+
+
+def run_batch(job):
+    """Simulate one batch of scenarios; returns per-scenario summaries and a SOC histogram."""
+    rows, seed, days, step_minutes, params, threshold, points, weather, battery = job
+    rng = np.random.default_rng(seed)
+    hours, dt = time_axis(days, step_minutes)
+    grid = np.broadcast_to(hours, (rows, len(hours)))
+    wind = wind_profile(grid, rng=rng, **weather.get("wind", {}))
+    sun = solar_profile(grid, rng=rng, **weather.get("solar", {}))
+    result = simulate(wind, sun, dt, params, battery=battery)
+
+    capacity = float(capacity_wh(params))
+    soc = result.soc_wh
+    short = short_steps(result, dt, params, battery=battery)
+    percent = soc * (100.0 / capacity)
+
+    # SOC samples counted per (time bucket, SOC bin); histograms from
+    # different batches simply add up
+    steps = soc.shape[1]
+    bucket = np.arange(steps) * points // steps
+    level = np.minimum((percent * (SOC_BINS / 100.0)).astype(np.int64), SOC_BINS)
+    histogram = np.bincount((bucket * (SOC_BINS + 1) + level).ravel(),
+                            minlength=points * (SOC_BINS + 1)).reshape(points, SOC_BINS + 1)
+    return {
+        "short_steps": short.sum(axis=1),
+        "hours_below": (soc < threshold * capacity).sum(axis=1) * dt,
+        "min_soc": percent.min(axis=1),
+        "final_soc": percent[:, -1],
+        "histogram": histogram,
+    }
+
+
+def histogram_percentiles(histogram, percentiles=PERCENTILES):
+    """SOC % at each percentile for every row of a (bucket x SOC bin) count table."""
+    cumulative = np.cumsum(histogram, axis=1)
+    total = cumulative[:, -1:]
+    results = {}
+    for p in percentiles:
+        # first bin whose cumulative count reaches p% of the samples
+        index = (cumulative < total * (p / 100.0)).sum(axis=1)
+        results[p] = np.minimum(index, SOC_BINS) * (100.0 / SOC_BINS)
+    return results
+
+
+def run_ensemble(scenarios=2000, days=1, step_minutes=15, params=Params(), seed=42,
+                 threshold=0.2, workers=1, max_mb=256, points=96, weather=None, battery=None):
+    """Run `scenarios` independent weather realisations and summarise them.
+
+    `weather` may hold keyword arguments for wind_profile and solar_profile
+    under "wind" and "solar" (e.g. the EL3-EL5 settings). Percentile bands
+    pool the steps into at most `points` time buckets. `battery` is a
+    hybrid_battery model (the ideal EL battery by default).
+    """
+    hours, dt = time_axis(days, step_minutes)
+    steps = len(hours)
+    points = min(points, steps)
+    bucket = np.arange(steps) * points // steps
+    rows = batch_rows(steps, max_mb)
+    sizes = [min(rows, scenarios - start) for start in range(0, scenarios, rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(size, child, days, step_minutes, params, threshold, points, weather or {}, battery)
+            for size, child in zip(sizes, seeds)]
+
+    if workers > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            batches = pool.map(run_batch, jobs)
+    else:
+        batches = [run_batch(job) for job in jobs]
+
+    short_steps = np.concatenate([batch["short_steps"] for batch in batches])
+    hours_below = np.concatenate([batch["hours_below"] for batch in batches])
+    histogram = sum(batch["histogram"] for batch in batches)
+    return EnsembleResult(
+        scenarios=scenarios,
+        loss_of_load=float(np.mean(short_steps > 0)),
+        lole_fraction=float(short_steps.sum()) / (scenarios * steps),
+        below_probability=float(np.mean(hours_below > 0)),
+        percentile_hours=hours[np.searchsorted(bucket, np.arange(points))],
+        soc_percentiles=histogram_percentiles(histogram),
+        hours_below=hours_below,
+        min_soc=np.concatenate([batch["min_soc"] for batch in batches]),
+        final_soc=np.concatenate([batch["final_soc"] for batch in batches]),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo ensemble of the hybrid wind-solar model")
+    parser.add_argument("--scenarios", type=int, default=2000)
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--step", type=float, default=15, help="step length in minutes")
+    parser.add_argument("--load", type=float, default=35, help="constant load in W")
+    parser.add_argument("--threshold", type=float, default=20, help="critical SOC in %%")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lead-acid", action="store_true", help="use hybrid_battery.LeadAcidBattery")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-mb", type=float, default=256, help="memory for one batch of scenarios")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_ensemble(args.scenarios, args.days, args.step, Params(load_w=args.load), args.seed,
+                          args.threshold / 100.0, args.workers, args.max_mb,
+                          battery=LeadAcidBattery() if args.lead_acid else None)
+    elapsed = time.perf_counter() - start
+
+    print(f"{result.scenarios} scenarios in {elapsed:.2f}s")
+    print(f"Loss-of-load probability: {100 * result.loss_of_load:.2f}% of scenarios "
+          f"({100 * result.lole_fraction:.3f}% of steps)")
+    print(f"P(SOC < {args.threshold:g}%): {100 * result.below_probability:.2f}%")
+    hours_below = np.percentile(result.hours_below, PERCENTILES)
+    print("Hours below threshold, percentiles " + ", ".join(
+        f"p{p}: {h:.2f}" for p, h in zip(PERCENTILES, hours_below)))
+    print("Minimum SOC %, percentiles " + ", ".join(
+        f"p{p}: {s:.1f}" for p, s in zip(PERCENTILES, np.percentile(result.min_soc, PERCENTILES))))
+    print("Final SOC %, percentiles " + ", ".join(
+        f"p{p}: {s:.1f}" for p, s in zip(PERCENTILES, np.percentile(result.final_soc, PERCENTILES))))
+
+
+if __name__ == "__main__":
+    main()
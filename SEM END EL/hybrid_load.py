@@ -0,0 +1,226 @@
+# hybrid_load.py
+# Time-varying loads and dispatch policies (load shedding, curtailment accounting) for the hybrid model
+#
+#   python hybrid_load.py                          a week of residential load with shedding below 30% SOC
+#   python hybrid_load.py --profile industrial --scenarios 500 --days 30
+#
+# Loads are (rows x time) arrays in W: a daily shape from residential_profile
+# or industrial_profile, plus random appliance_events. dispatch() runs them
+# against wind and solar generation and a battery from hybrid_battery, and
+# accounts for every Wh: served, shed by policy, unmet because the battery
+# could not cover it, and curtailed because the battery could not take it.
+#
+# Shedding depends on the SOC, so dispatch() works a block of steps at a
+# time: guess which steps are shed, run the battery, re-decide from the SOC
+# path, and repeat until the decisions stop changing. Pass k always gets the
+# first k steps of the block right, so this ends with the exact answer.
+
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from hybrid_battery import IdealBattery, LeadAcidBattery
+from hybrid_sim import (
+    Params, capacity_wh, per_row, previous_soc, rotor_area, solar_power, solar_profile,
+    time_axis, wind_power, wind_profile,
+)
+
+DispatchResult = namedtuple("DispatchResult", [
+    "soc_wh",        # SOC after each step
+    "served_w",      # load actually served in each step
+    "shed",          # True where the non-critical load was shed
+    "unmet_wh",      # per row: load energy neither served nor shed (battery empty or at its power cap)
+    "shed_wh",       # per row: load energy dropped by the shedding policy
+    "curtailed_wh",  # per row: surplus generation the battery could not store
+    "capacity_wh",   # per row: usable capacity at the end
+])
+
+
+# --- 1. LOAD PROFILES ---
+
+def _household(hours):
+    h = np.asarray(hours, dtype=float) % 24
+    return 0.5 + 0.9 * np.exp(-0.5 * ((h - 7.5) / 1.2) ** 2) + 1.6 * np.exp(-0.5 * ((h - 20) / 1.8) ** 2)
+
+
+HOUSEHOLD_MEAN = _household(np.arange(0, 24, 1 / 60.0)).mean()
+
+
+def residential_profile(hours, mean_w=35):
+    """Household shape: low overnight, a morning peak around 7 h and a larger evening peak around 20 h."""
+    return mean_w * _household(hours) / HOUSEHOLD_MEAN
+
+
+def industrial_profile(hours, mean_w=35, start_h=8, end_h=18, idle=0.2, weekends=True):
+    """Workshop shape: flat at full power during working hours, `idle` of it otherwise and on weekends."""
+    hours = np.asarray(hours, dtype=float)
+    h = hours % 24
+    working = (h >= start_h) & (h < end_h)
+    if weekends:
+        working &= (hours // 24) % 7 < 5
+    daily_mean = idle + (1 - idle) * (end_h - start_h) / 24.0 * (5 / 7.0 if weekends else 1)
+    return mean_w * np.where(working, 1.0, idle) / daily_mean
+
+
+def appliance_events(shape, dt, rate_per_h=0.2, duration_h=0.5, power_w=60, rng=None):
+    """Random appliance runs: starts arrive at `rate_per_h`, each draws `power_w` for `duration_h`."""
+    rng = np.random.default_rng() if rng is None else rng
+    starts = (rng.random(shape) < rate_per_h * dt).astype(np.int32)
+    length = max(1, int(round(duration_h / dt)))
+    # running count of appliances on: starts in the last `length` steps
+    running = np.cumsum(starts, axis=-1)
+    running[..., length:] -= running[..., :-length].copy()
+    return running * float(power_w)
+
+
+# --- 2. DISPATCH ---
+
+def _accounts(p_net, soc, start, dt, battery, capacity):
+    """(unmet Wh, curtailed Wh) for each step of one battery run, priced by the battery model.
+
+    Each Wh of SOC change is converted back to energy at the battery's
+    terminals at that step's own efficiency, so rate losses count as losses,
+    while surplus refused by a C-rate cap, the taper or a full battery counts
+    as curtailed and load beyond what the battery delivered counts as unmet.
+    """
+    change = soc - previous_soc(soc, start)
+    energy = p_net * dt
+    delta = battery.delta(p_net, dt, capacity)
+    terminal = battery.power(p_net, capacity) * dt
+    # terminal energy per Wh of SOC change: 1 / efficiency charging, efficiency discharging
+    per_wh = np.divide(terminal, delta, out=np.zeros(delta.shape), where=delta != 0)
+    delivered = np.maximum(-change, 0.0) * per_wh
+    absorbed = np.maximum(change, 0.0) * per_wh
+    unmet = np.maximum(np.maximum(-energy, 0.0) - delivered, 0.0)
+    curtailed = np.maximum(np.maximum(energy, 0.0) - absorbed, 0.0)
+    return unmet, curtailed
+
+
+def dispatch(wind_speed, irradiance, load_w, dt, params=Params(), battery=None,
+             shed_below=None, critical=0.5, block_h=24):
+    """Run generation against a load array with an optional shedding policy.
+
+    While the SOC at the start of a step is under `shed_below` (a fraction of
+    capacity), only the `critical` share of that step's load is served.
+    `load_w` broadcasts against the weather: one profile for all rows, or
+    one per row.
+    """
+    battery = IdealBattery(params.controller_eff) if battery is None else battery
+    generation = (wind_power(wind_speed, per_row(rotor_area(params)), per_row(params.wind_eff))
+                  + solar_power(irradiance, per_row(params.pv_area), per_row(params.solar_eff)))
+    generation, load_w = np.broadcast_arrays(generation, np.asarray(load_w, dtype=float))
+    rows = generation.shape[:-1]
+    steps = generation.shape[-1]
+    capacity = np.array(np.broadcast_to(capacity_wh(params), rows), dtype=float)
+    start = params.initial_soc * capacity
+
+    soc_wh = np.empty(generation.shape)
+    shed = np.zeros(generation.shape, dtype=bool)
+    unmet = np.zeros(rows)
+    curtailed = np.zeros(rows)
+    block = max(1, int(round(block_h / dt)))
+    for begin in range(0, steps, block):
+        gen = generation[..., begin:begin + block]
+        full = load_w[..., begin:begin + block]
+        cut = np.zeros(gen.shape, dtype=bool)
+        while True:
+            served = np.where(cut, full * critical, full)
+            soc, end_capacity = battery.run(gen - served, dt, capacity, start)
+            if shed_below is None:
+                break
+            decided = previous_soc(soc, start) < shed_below * per_row(capacity)
+            if np.array_equal(decided, cut):
+                break
+            cut = decided
+        soc_wh[..., begin:begin + block] = soc
+        shed[..., begin:begin + block] = cut
+        step_unmet, step_curtailed = _accounts(gen - served, soc, start, dt, battery, capacity)
+        unmet += step_unmet.sum(axis=-1)
+        curtailed += step_curtailed.sum(axis=-1)
+        capacity = np.array(np.broadcast_to(end_capacity, rows), dtype=float)
+        start = np.minimum(soc[..., -1], capacity)
+
+    served_w = np.where(shed, load_w * critical, load_w)
+    shed_wh = ((load_w - served_w) * dt).sum(axis=-1)
+    return DispatchResult(soc_wh, served_w, shed, unmet, shed_wh, curtailed, capacity)
+
+
+def dispatch_loop(wind_speed, irradiance, load_w, dt, params=Params(), shed_below=None, critical=0.5,
+                  battery=None):
+    """dispatch() for one row, one step at a time with the battery's exact taper and fade; the reference."""
+    battery = IdealBattery(params.controller_eff) if battery is None else battery
+    taper = getattr(battery, "acceptance", None)
+    fade = getattr(battery, "fade_per_cycle", 0.0)
+    block = max(1, int(round(getattr(battery, "block_h", 24) / dt)))
+    capacity = float(capacity_wh(params))
+    area = float(rotor_area(params))
+    current = params.initial_soc * capacity
+    soc_wh = np.empty(len(load_w))
+    unmet = shed_wh = curtailed = moved = 0.0
+    for i in range(len(load_w)):
+        load = load_w[i]
+        if shed_below is not None and current < shed_below * capacity:
+            shed_wh += load * (1 - critical) * dt
+            load = load * critical
+        generation = 0.5 * 1.225 * area * wind_speed[i] ** 3 * params.wind_eff \
+            + irradiance[i] * params.pv_area * params.solar_eff
+        p_net = generation - load
+        energy = p_net * dt
+        step = float(battery.delta(p_net, dt, capacity))
+        per_wh = float(battery.power(p_net, capacity)) * dt / step if step else 0.0
+        if step > 0 and taper is not None:
+            step *= float(taper(current / capacity))
+        new = min(max(current + step, 0.0), capacity)
+        if energy > 0:
+            curtailed += max(energy - (new - current) * per_wh, 0.0)
+        else:
+            unmet += max(-energy - (current - new) * per_wh, 0.0)
+        moved += abs(new - current)
+        current = soc_wh[i] = new
+        if fade and ((i + 1) % block == 0 or i + 1 == len(load_w)):
+            capacity *= 1.0 - fade * moved / (2.0 * capacity)
+            current = min(current, capacity)
+            moved = 0.0
+    return soc_wh, unmet, shed_wh, curtailed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-varying load and dispatch policies for the hybrid model")
+    parser.add_argument("--profile", choices=("residential", "industrial"), default="residential")
+    parser.add_argument("--load", type=float, default=40, help="mean load in W before appliance events")
+    parser.add_argument("--events", type=float, default=0.2, help="appliance starts per hour")
+    parser.add_argument("--shed-below", type=float, default=30, help="SOC %% under which non-critical load is shed (-1: never)")
+    parser.add_argument("--critical", type=float, default=50, help="share of the load that is never shed, %%")
+    parser.add_argument("--scenarios", type=int, default=1)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--step", type=float, default=15, help="step length in minutes")
+    parser.add_argument("--battery-ah", type=float, default=100)
+    parser.add_argument("--lead-acid", action="store_true", help="use hybrid_battery.LeadAcidBattery")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    hours, dt = time_axis(args.days, args.step)
+    grid = np.broadcast_to(hours, (args.scenarios, len(hours)))
+    profile = residential_profile if args.profile == "residential" else industrial_profile
+    load = profile(hours, args.load) + appliance_events(grid.shape, dt, args.events, rng=rng)
+    params = Params(battery_ah=args.battery_ah)
+    shed_below = None if args.shed_below < 0 else args.shed_below / 100.0
+
+    start = time.perf_counter()
+    result = dispatch(wind_profile(grid, rng=rng), solar_profile(grid, rng=rng), load, dt, params,
+                      LeadAcidBattery() if args.lead_acid else None, shed_below, args.critical / 100.0)
+    elapsed = time.perf_counter() - start
+    demand = load.sum(axis=-1) * dt
+    print(f"{args.scenarios} x {len(hours)} steps in {elapsed:.2f}s")
+    print(f"Demand {demand.mean() / 1000:.2f} kWh per scenario: "
+          f"unmet {100 * np.mean(result.unmet_wh / demand):.2f}%, "
+          f"shed {100 * np.mean(result.shed_wh / demand):.2f}%")
+    print(f"Curtailed generation {result.curtailed_wh.mean() / 1000:.2f} kWh per scenario; "
+          f"shedding active {100 * result.shed.mean():.1f}% of the time")
+
+
+if __name__ == "__main__":
+    main()
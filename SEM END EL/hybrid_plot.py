@@ -0,0 +1,181 @@
+# hybrid_plot.py
+# Headless plots of long hybrid runs: decimate first, then render to PNG or SVG
+#
+#   python hybrid_plot.py --days 365 --step 1 --out year.png        one run, EL2-style figure
+#   python hybrid_plot.py --runs 16 --days 30 --out-dir plots --format svg
+#
+# A year at 1-minute steps is 525,600 points per line; no screen shows more
+# than a few thousand, so every series is cut down to `points` before it
+# reaches matplotlib. "minmax" keeps each bucket's extremes, so peaks and
+# dips survive exactly; "lttb" (largest triangle three buckets) keeps the
+# points that best preserve the line's shape. Figures are drawn on the Agg
+# canvas, never through pyplot, so no display is needed and several worker
+# processes can render at once.
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from hybrid_sim import Params, capacity_wh, simulate, solar_profile, time_axis, wind_profile
+
+
+def minmax(y, points):
+    """Indices of the lowest and highest y in each of points // 2 equal buckets, in order."""
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    buckets = max(1, points // 2)
+    size = -(-n // buckets)
+    padded = np.concatenate([y, np.repeat(y[-1:], buckets * size - n)]).reshape(buckets, size)
+    starts = np.arange(buckets) * size
+    picks = np.concatenate([starts + padded.argmin(axis=1), starts + padded.argmax(axis=1), [0, n - 1]])
+    return np.unique(np.minimum(picks, n - 1))
+
+
+def lttb(x, y, points):
+    """Indices chosen by largest-triangle-three-buckets, first and last point included."""
+    n = len(y)
+    if n <= points or points < 3:
+        return np.arange(n)
+    # points - 2 buckets between the fixed first and last points
+    edges = np.arange(points - 1) * (n - 2) // (points - 2) + 1
+    chosen = np.empty(points, dtype=np.int64)
+    chosen[0] = 0
+    chosen[-1] = n - 1
+    a = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the triangle's third corner
+        following = edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[stop:following].mean()
+        cy = y[stop:following].mean()
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(area.argmax())
+        chosen[i + 1] = a
+    return chosen
+
+
+def decimate(x, y, points, method="minmax"):
+    """(x, y) cut down to about `points` samples."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    index = lttb(x, y, points) if method == "lttb" else minmax(y, points)
+    return x[index], y[index]
+
+
+def run_series(hours, result, params=Params(), points=2000, method="minmax"):
+    """The lines of an EL2-style figure, already decimated; small enough to send to a worker."""
+    soc_percent = result.soc_wh * (100.0 / float(capacity_wh(params)))
+    return {
+        "solar": decimate(hours, result.p_solar, points, method),
+        "wind": decimate(hours, result.p_wind, points, method),
+        "total": decimate(hours, result.p_solar + result.p_wind, points, method),
+        "soc": decimate(hours, soc_percent, points, method),
+        "load": params.load_w,
+    }
+
+
+def render(path, series, title=""):
+    """Draw one decimated run as EL2's power and SOC panels and save it; the format follows the extension."""
+    figure = Figure(figsize=(14, 10))
+    FigureCanvasAgg(figure)
+    power, soc = figure.subplots(2, 1)
+
+    power.plot(*series["solar"], label='Solar Power (W)', color='orange', linewidth=0.8)
+    power.plot(*series["wind"], label='Wind Power (W)', color='skyblue', linewidth=0.8)
+    power.plot(*series["total"], label='Total Hybrid Power (W)', color='green', linestyle='--', linewidth=1)
+    power.axhline(y=series["load"], color='red', linestyle=':', label=f'Load ({series["load"]:g}W)')
+    power.set_title(f'Hybrid Power Generation vs Load{title}')
+    power.set_xlabel('Time (Hours)')
+    power.set_ylabel('Power (W)')
+    power.grid(True)
+    power.legend(loc='upper right')
+
+    soc.plot(*series["soc"], label='Battery SOC (%)', color='purple', linewidth=1.5)
+    soc.axhline(y=100, color='green', linestyle='--', alpha=0.6, label='Max Capacity')
+    soc.axhline(y=20, color='red', linestyle='--', alpha=0.6, label='Min SOC Threshold')
+    soc.set_title('Battery State of Charge Over Time')
+    soc.set_xlabel('Time (Hours)')
+    soc.set_ylabel('SOC (%)')
+    soc.set_ylim(0, 105)
+    soc.grid(True)
+    soc.legend(loc='upper right')
+
+    figure.tight_layout()
+    figure.savefig(path)
+    return path
+
+
+def render_bands(path, ensemble, threshold=20):
+    """SOC percentile bands of a hybrid_ensemble.EnsembleResult."""
+    figure = Figure(figsize=(14, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.subplots()
+    hours = ensemble.percentile_hours
+    bands = ensemble.soc_percentiles
+    axes.fill_between(hours, bands[5], bands[95], color='#6A1B9A', alpha=0.2, label='5-95%')
+    axes.fill_between(hours, bands[25], bands[75], color='#6A1B9A', alpha=0.4, label='25-75%')
+    axes.plot(hours, bands[50], color='#6A1B9A', linewidth=2, label='Median')
+    axes.axhline(y=threshold, color='r', linestyle='--', alpha=0.6, label=f'{threshold:g}% Critical Low')
+    axes.set_title(f'Battery SOC over {ensemble.scenarios} weather scenarios')
+    axes.set_xlabel('Time (Hours)')
+    axes.set_ylabel('State of Charge (%)')
+    axes.set_ylim(0, 105)
+    axes.grid(True, linestyle='--', alpha=0.6)
+    axes.legend(loc='upper right')
+    figure.tight_layout()
+    figure.savefig(path)
+    return path
+
+
+def _render_job(job):
+    return render(*job)
+
+
+def render_many(jobs, workers=1):
+    """Render (path, series, title) jobs, on a process pool when workers > 1; returns the paths."""
+    if workers > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            return pool.map(_render_job, jobs)
+    return [_render_job(job) for job in jobs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decimated, headless plots of hybrid simulation runs")
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--step", type=float, default=15, help="step length in minutes")
+    parser.add_argument("--runs", type=int, default=1, help="number of weather scenarios to plot")
+    parser.add_argument("--points", type=int, default=2000, help="points kept per line")
+    parser.add_argument("--method", choices=("minmax", "lttb"), default="minmax")
+    parser.add_argument("--out", default="hybrid.png", help="file for a single run")
+    parser.add_argument("--out-dir", default=".", help="directory for several runs")
+    parser.add_argument("--format", choices=("png", "svg"), default="png")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    hours, dt = time_axis(args.days, args.step)
+    jobs = []
+    for run in range(args.runs):
+        result = simulate(wind_profile(hours, rng=rng), solar_profile(hours, rng=rng), dt)
+        series = run_series(hours, result, points=args.points, method=args.method)
+        if args.runs == 1:
+            path = args.out
+        else:
+            path = os.path.join(args.out_dir, f"run_{run + 1:03d}.{args.format}")
+        jobs.append((path, series, f" (run {run + 1})" if args.runs > 1 else ""))
+    if args.runs > 1:
+        os.makedirs(args.out_dir, exist_ok=True)
+    paths = render_many(jobs, args.workers)
+    print(f"{len(paths)} plot(s) of {len(hours)} steps in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
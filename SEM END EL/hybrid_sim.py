@@ -0,0 +1,349 @@
+# hybrid_sim.py
+# Vectorized wind-solar-battery simulation: the EL scripts' model without the per-step loop
+#
+#   python hybrid_sim.py              one 24-hour day like EL2, then a timing run
+#   python hybrid_sim.py 2 1          2 years at 1-minute steps
+#
+# Power is computed for every time step in one NumPy expression, and the
+# clipped SOC recurrence is solved without a per-step loop: a prefix scan over
+# rows of scenarios (soc_series), and for a single series a blocked running
+# sum that matches the loop bit for bit (soc_blocked). A year at 1-minute
+# resolution (525,600 steps) runs in a fraction of a second.
+# Inputs may be 2-D (scenarios x time); everything works along the last axis.
+
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# --- 1. SYSTEM PARAMETERS ---
+# Defaults are the prototype values shared by EL2-EL5.
+RHO = 1.225  # Air density in kg/m³
+
+Params = namedtuple("Params", [
+    "rotor_radius",    # meters
+    "pv_area",         # m²
+    "battery_ah",      # Ah
+    "battery_v",       # V
+    "load_w",          # Watts (constant load)
+    "wind_eff",        # Wind power coefficient (Cp)
+    "solar_eff",       # PV cell efficiency
+    "controller_eff",  # Charge controller efficiency, applied on charge and discharge
+    "initial_soc",     # Starting SOC as a fraction of capacity
+])
+Params.__new__.__defaults__ = (0.5, 0.45, 100, 12, 35, 0.40, 0.20, 0.90, 0.5)
+
+# capacity_wh is the usable capacity at the end of the run (less than
+# nameplate only for battery models with fade)
+Result = namedtuple("Result", ["p_wind", "p_solar", "p_net", "soc_wh", "capacity_wh"])
+Result.__new__.__defaults__ = (None,)
+
+
+def rotor_area(params):
+    return np.pi * np.asarray(params.rotor_radius, dtype=float) ** 2
+
+
+def capacity_wh(params):
+    return np.asarray(params.battery_ah, dtype=float) * params.battery_v
+
+
+# --- 2. PHYSICS MODELS ---
+
+def wind_power(wind_speed, area, eff=0.40):
+    """P = 0.5 * rho * A * V^3 * Cp, for whole arrays of wind speed."""
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    return 0.5 * RHO * area * wind_speed ** 3 * eff
+
+
+def solar_power(irradiance, area, eff=0.20):
+    """P = G * A * Efficiency, for whole arrays of irradiance."""
+    return np.asarray(irradiance, dtype=float) * area * eff
+
+
+def soc_delta(p_net, dt, controller_eff=0.90):
+    """Energy into (+) or out of (-) the battery for each step, before clipping.
+
+    Charging stores P * dt * eff; discharging draws |P * dt| / eff, as in update_soc.
+    """
+    p_net = np.asarray(p_net, dtype=float)
+    energy = p_net * dt
+    return np.where(p_net > 0, energy * controller_eff, -(np.abs(energy) / controller_eff))
+
+
+def update_soc(prev_soc_wh, p_net_w, time_step_h, max_capacity_wh, controller_eff=0.90):
+    """One step of the EL scripts' SOC update, kept as the scalar reference."""
+    if p_net_w > 0:
+        return min(max(prev_soc_wh + p_net_w * time_step_h * controller_eff, 0.0), max_capacity_wh)
+    return min(max(prev_soc_wh - abs(p_net_w * time_step_h) / controller_eff, 0.0), max_capacity_wh)
+
+
+# --- 3. SOC KERNELS ---
+
+def soc_loop(delta, capacity, initial):
+    """SOC after each step by the plain sequential loop (1-D only); the reference for soc_series."""
+    soc = np.empty(len(delta))
+    current = float(initial)
+    capacity = float(capacity)
+    for i, step in enumerate(np.asarray(delta, dtype=float).tolist()):
+        current = min(max(current + step, 0.0), capacity)
+        soc[i] = current
+    return soc
+
+
+def soc_series(delta, capacity, initial):
+    """SOC after each step of soc[t] = clip(soc[t-1] + delta[t], 0, capacity).
+
+    Each step is the map x -> clip(x + a, lo, hi), and two such maps compose
+    into another one:
+
+        clip(clip(x + a1, lo1, hi1) + a2, lo2, hi2)
+            = clip(x + a1 + a2, clip(lo1 + a2, lo2, hi2), clip(hi1 + a2, lo2, hi2))
+
+    so the whole recurrence is a prefix scan over (a, lo, hi), done here in
+    log2(n) vectorized passes. Sums are re-associated, so results can differ
+    from soc_loop in the last few bits. `capacity` and `initial` broadcast
+    against `delta` without its time axis, e.g. one per scenario row.
+    """
+    shift = np.array(delta, dtype=float)
+    steps = shift.shape[-1]
+    capacity = np.asarray(capacity, dtype=float)
+    if capacity.ndim:
+        capacity = capacity[..., None]
+    low = np.zeros(shift.shape)
+    high = np.empty(shift.shape)
+    high[...] = capacity
+
+    offset = 1
+    while offset < steps:
+        # compose each step's map with the one `offset` steps earlier
+        a = shift[..., offset:]
+        lo = low[..., offset:]
+        hi = high[..., offset:]
+        new_low = np.clip(low[..., :-offset] + a, lo, hi)
+        new_high = np.clip(high[..., :-offset] + a, lo, hi)
+        shift[..., offset:] = shift[..., :-offset] + a
+        low[..., offset:] = new_low
+        high[..., offset:] = new_high
+        offset *= 2
+
+    initial = np.asarray(initial, dtype=float)
+    if initial.ndim:
+        initial = initial[..., None]
+    return np.clip(initial + shift, low, high)
+
+
+def soc_blocked(delta, capacity, initial, block=8192, settle=32):
+    """soc_series with results bit-identical to soc_loop, using only NumPy.
+
+    Between clip events the SOC is a running sum, and np.cumsum adds left to
+    right exactly as the loop does, so each block starts as one cumsum from
+    the current charge. The first step that leaves [0, capacity] ends the
+    block there: it is clipped, and the steps after it, where further clips
+    tend to follow, are taken one at a time until `settle` pass unclipped. A battery left empty
+    (or full) stays so while the flow keeps draining (or filling) it, and
+    that stretch is filled in one slice. Blocks restart small after a clip
+    and double up to `block` while no clip is met. Rows of 2-D input are
+    done one after another.
+    """
+    delta = np.asarray(delta, dtype=float)
+    if delta.ndim > 1:
+        rows = delta.shape[:-1]
+        capacity = np.broadcast_to(capacity, rows)
+        initial = np.broadcast_to(initial, rows)
+        soc = np.empty(delta.shape)
+        for row in np.ndindex(rows):
+            soc[row] = soc_blocked(delta[row], capacity[row], initial[row], block, settle)
+        return soc
+
+    steps = len(delta)
+    soc = np.empty(steps)
+    capacity = float(capacity)
+    current = float(initial)
+    size = min(256, block)
+    i = 0
+    while i < steps:
+        stop = min(i + size, steps)
+        run = np.cumsum(np.concatenate(([current], delta[i:stop])))[1:]
+        outside = (run < 0.0) | (run > capacity)
+        j = int(outside.argmax())
+        if not outside[j]:
+            soc[i:stop] = run
+            current = run[-1]
+            i = stop
+            size = min(2 * size, block)
+            continue
+
+        soc[i:i + j] = run[:j]
+        current = 0.0 if run[j] < 0.0 else capacity
+        soc[i + j] = current
+        i += j + 1
+        # step one at a time until `settle` steps in a row pass without a clip
+        clipped = True
+        while clipped and i < steps:
+            clipped = False
+            stop = min(i + settle, steps)
+            for k, step in enumerate(delta[i:stop].tolist(), i):
+                current += step
+                if current < 0.0:
+                    current = 0.0
+                    clipped = True
+                elif current > capacity:
+                    current = capacity
+                    clipped = True
+                soc[k] = current
+            i = stop
+        size = min(256, block)
+
+        if current == 0.0 or current == capacity:
+            ahead = delta[i:i + block]
+            pinned = ahead < 0.0 if current == 0.0 else ahead > 0.0
+            length = int(pinned.argmin()) if not pinned.all() else len(ahead)
+            soc[i:i + length] = 0.0 if current == 0.0 else capacity
+            if length:
+                current = soc[i + length - 1]
+            i += length
+    return soc
+
+
+def soc_path(delta, capacity, initial):
+    """soc_blocked for a single series, where it is exact and fastest; soc_series for rows."""
+    if np.ndim(delta) == 1:
+        return soc_blocked(delta, capacity, initial)
+    return soc_series(delta, capacity, initial)
+
+
+# --- 4. WEATHER INPUTS ---
+
+def solar_profile(hours, g_max=1000, noise=0.1, rng=None):
+    """Clear-sky irradiance peaking at noon with multiplicative cloud noise, clipped to [0, g_max]."""
+    rng = np.random if rng is None else rng
+    hours = np.asarray(hours, dtype=float)
+    irradiance = g_max * np.maximum(0, np.sin(np.pi * (hours - 6) / 12))
+    irradiance *= 1 + noise * rng.standard_normal(hours.shape)
+    return np.clip(irradiance, 0, g_max)
+
+
+def wind_profile(hours, base=6, swing=3, noise=1.5, phase_h=0, rng=None):
+    """Diurnal wind speed with additive turbulence, clipped to [0, 15] m/s."""
+    rng = np.random if rng is None else rng
+    hours = np.asarray(hours, dtype=float)
+    speed = base + swing * np.sin(2 * np.pi * (hours - phase_h) / 24)
+    speed += noise * rng.standard_normal(hours.shape)
+    return np.clip(speed, 0, 15)
+
+
+# --- 5. SIMULATION ---
+
+def per_row(value):
+    """A parameter as given, or an array of per-row values with a time axis added."""
+    value = np.asarray(value, dtype=float)
+    return value[..., None] if value.ndim else value
+
+
+def simulate(wind_speed, irradiance, dt, params=Params(), initial_wh=None, battery=None):
+    """Run the hybrid model over whole arrays of wind speed (m/s) and irradiance (W/m²).
+
+    `dt` is the step length in hours. Returns a Result of arrays shaped like
+    the inputs; soc_wh holds the SOC after each step. Any field of `params`
+    may be an array with one value per row (e.g. one per design), in which
+    case 1-D weather is shared by all rows. `initial_wh` overrides the
+    starting charge, e.g. to carry the SOC from one chunk of a run to the next.
+    `battery` is a model from hybrid_battery; by default the battery is the
+    EL scripts' ideal one with params.controller_eff.
+    """
+    p_wind = wind_power(wind_speed, per_row(rotor_area(params)), per_row(params.wind_eff))
+    p_solar = solar_power(irradiance, per_row(params.pv_area), per_row(params.solar_eff))
+    p_net = p_wind + p_solar - per_row(params.load_w)
+    capacity = capacity_wh(params)
+    if initial_wh is None:
+        initial_wh = params.initial_soc * capacity
+    if battery is not None:
+        soc_wh, end_capacity = battery.run(p_net, dt, capacity, initial_wh)
+        return Result(p_wind, p_solar, p_net, soc_wh, end_capacity)
+    delta = soc_delta(p_net, dt, per_row(params.controller_eff))
+    soc_wh = soc_path(delta, capacity, initial_wh)
+    return Result(p_wind, p_solar, p_net, soc_wh, capacity)
+
+
+def previous_soc(soc_wh, initial_wh):
+    """The SOC before each step: the starting charge, then soc_wh shifted by one."""
+    previous = np.empty_like(soc_wh)
+    previous[..., 0] = initial_wh
+    previous[..., 1:] = soc_wh[..., :-1]
+    return previous
+
+
+def short_steps(result, dt, params=Params(), initial_wh=None, battery=None):
+    """True for each step where the battery could not cover the load."""
+    capacity = capacity_wh(params)
+    if initial_wh is None:
+        initial_wh = params.initial_soc * capacity
+    if battery is not None:
+        return battery.short_steps(result.p_net, result.soc_wh, dt, capacity, initial_wh)
+    delta = soc_delta(result.p_net, dt, per_row(params.controller_eff))
+    return previous_soc(result.soc_wh, initial_wh) + delta < 0
+
+
+def simulate_loop(wind_speed, irradiance, dt, params=Params()):
+    """The EL scripts' step-by-step loop, for checking and timing simulate()."""
+    area = float(rotor_area(params))
+    capacity = float(capacity_wh(params))
+    steps = len(wind_speed)
+    p_wind_hist = np.zeros(steps)
+    p_solar_hist = np.zeros(steps)
+    p_net_hist = np.zeros(steps)
+    soc_hist_wh = np.zeros(steps)
+    current_soc = params.initial_soc * capacity
+    for i in range(steps):
+        p_wind = 0.5 * RHO * area * wind_speed[i] ** 3 * params.wind_eff
+        p_solar = irradiance[i] * params.pv_area * params.solar_eff
+        p_net = p_wind + p_solar - params.load_w
+        current_soc = update_soc(current_soc, p_net, dt, capacity, params.controller_eff)
+        p_wind_hist[i] = p_wind
+        p_solar_hist[i] = p_solar
+        p_net_hist[i] = p_net
+        soc_hist_wh[i] = current_soc
+    return Result(p_wind_hist, p_solar_hist, p_net_hist, soc_hist_wh, capacity)
+
+
+def time_axis(days=1, step_minutes=15):
+    """(hours, dt) for `days` of steps, the first at t=0 like EL2's Hours array."""
+    dt = step_minutes / 60.0
+    steps = int(round(days * 24 / dt))
+    return np.arange(steps) * dt, dt
+
+
+if __name__ == "__main__":
+    rng = np.random.RandomState(42)
+    hours, dt = time_axis(1, 15)
+    result = simulate(wind_profile(hours, rng=rng), solar_profile(hours, rng=rng), dt)
+    soc_percent = 100 * result.soc_wh / capacity_wh(Params())
+    print(f"24 h at 15 min: final SOC {soc_percent[-1]:.2f}%, minimum {soc_percent.min():.2f}%")
+
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    minutes = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    hours, dt = time_axis(365 * years, minutes)
+    wind = wind_profile(hours, rng=rng)
+    sun = solar_profile(hours, rng=rng)
+    start = time.perf_counter()
+    result = simulate(wind, sun, dt)
+    elapsed = time.perf_counter() - start
+    print(f"{len(hours)} steps in {elapsed:.3f}s ({len(hours) / elapsed:,.0f} steps/s)")
+
+    start = time.perf_counter()
+    reference = simulate_loop(wind, sun, dt)
+    loop_elapsed = time.perf_counter() - start
+    print(f"step loop: {loop_elapsed:.2f}s, max SOC difference {np.abs(reference.soc_wh - result.soc_wh).max():.2e} Wh")
+
+    # the SOC kernels alone, on the same energy steps
+    delta = soc_delta(result.p_net, dt)
+    capacity = float(capacity_wh(Params()))
+    exact = soc_loop(delta, capacity, 0.5 * capacity)
+    for name, kernel in (("loop", soc_loop), ("prefix scan", soc_series), ("blocked", soc_blocked)):
+        start = time.perf_counter()
+        soc = kernel(delta, capacity, 0.5 * capacity)
+        elapsed = time.perf_counter() - start
+        print(f"{name:12s} {elapsed:.3f}s ({len(delta) / elapsed:,.0f} steps/s), "
+              f"bit-identical to the loop: {np.array_equal(soc, exact)}, "
+              f"max difference {np.abs(soc - exact).max():.2e} Wh")
@@ -0,0 +1,142 @@
+# hybrid_sizing.py
+# Design-space sweep over rotor radius, PV area and battery size, with the cost/reliability Pareto front
+#
+#   python hybrid_sizing.py                          20 x 20 x 20 grid over 30 days
+#   python hybrid_sizing.py --points 47 --refine 3   ~10^5 designs, then 3 rounds of local search
+#   python hybrid_sizing.py --csv front.csv
+#
+# Every design sees the same weather (EL2-style, seeded), so designs differ
+# only by their hardware. Designs are simulated as rows of one
+# (design x time) array through hybrid_sim, in batches that fit `max_mb`.
+# Reliability is the fraction of steps where the load could not be met.
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from hybrid_battery import LeadAcidBattery
+from hybrid_sim import Params, short_steps, simulate, solar_profile, time_axis, wind_profile
+
+# rough prototype prices in USD
+TURBINE_COST_PER_M2 = 900   # per m² of swept rotor area
+PV_COST_PER_M2 = 250        # per m² of panel
+BATTERY_COST_PER_KWH = 150  # lead-acid, per kWh of nameplate capacity
+
+# (low, high) of each design variable: rotor radius m, PV area m², battery Ah
+BOUNDS = ((0.2, 1.5), (0.1, 3.0), (20, 400))
+
+# float64 arrays of (designs x steps) alive at once while a batch is simulated
+ARRAYS_PER_ROW = 8
+
+
+def design_cost(designs, params=Params()):
+    """Capital cost of each (rotor radius, PV area, battery Ah) row."""
+    radius, pv_area, battery_ah = designs[:, 0], designs[:, 1], designs[:, 2]
+    return (TURBINE_COST_PER_M2 * np.pi * radius ** 2 + PV_COST_PER_M2 * pv_area
+            + BATTERY_COST_PER_KWH * battery_ah * params.battery_v / 1000.0)
+
+
+def evaluate(designs, wind, sun, dt, params=Params(), battery=None):
+    """Loss-of-load fraction for each design row under one shared weather trace."""
+    sized = params._replace(rotor_radius=designs[:, 0], pv_area=designs[:, 1], battery_ah=designs[:, 2])
+    result = simulate(wind, sun, dt, sized, battery=battery)
+    return short_steps(result, dt, sized, battery=battery).mean(axis=1)
+
+
+def _evaluate_job(job):
+    return evaluate(*job)
+
+
+def evaluate_all(designs, wind, sun, dt, params=Params(), workers=1, max_mb=256, battery=None):
+    """evaluate() over any number of designs, batched to the memory budget and spread over a pool."""
+    rows = max(1, int(max_mb * 2 ** 20 // (len(wind) * 8 * ARRAYS_PER_ROW)))
+    jobs = [(designs[start:start + rows], wind, sun, dt, params, battery)
+            for start in range(0, len(designs), rows)]
+    if workers > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            parts = pool.map(_evaluate_job, jobs)
+    else:
+        parts = [_evaluate_job(job) for job in jobs]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def grid(points, bounds=BOUNDS):
+    """Every combination of `points` evenly spaced values per variable, as rows."""
+    axes = [np.linspace(low, high, points) for low, high in bounds]
+    return np.stack([axis.ravel() for axis in np.meshgrid(*axes, indexing="ij")], axis=1)
+
+
+def pareto_front(cost, risk):
+    """Indices of designs no other design beats on both cost and risk, cheapest first."""
+    order = np.lexsort((risk, cost))
+    best_before = np.minimum.accumulate(np.concatenate(([np.inf], risk[order][:-1])))
+    return order[risk[order] < best_before]
+
+
+def refine(designs, front, scale, rng, samples=20, bounds=BOUNDS):
+    """New designs scattered around the front, `scale` of each variable's range wide."""
+    low = np.array([b[0] for b in bounds], dtype=float)
+    high = np.array([b[1] for b in bounds], dtype=float)
+    centres = np.repeat(designs[front], samples, axis=0)
+    spread = (high - low) * scale
+    return np.clip(centres + rng.uniform(-1, 1, centres.shape) * spread, low, high)
+
+
+def optimise(points=20, rounds=0, days=30, step_minutes=15, params=Params(), seed=42,
+             workers=1, max_mb=256, battery=None):
+    """Grid sweep plus `rounds` of local search around the front; returns (designs, cost, risk, front)."""
+    rng = np.random.default_rng(seed)
+    hours, dt = time_axis(days, step_minutes)
+    wind = wind_profile(hours, rng=rng)
+    sun = solar_profile(hours, rng=rng)
+
+    designs = grid(points)
+    risk = evaluate_all(designs, wind, sun, dt, params, workers, max_mb, battery)
+    cost = design_cost(designs, params)
+    scale = 1.0 / points
+    for _ in range(rounds):
+        front = pareto_front(cost, risk)
+        extra = refine(designs, front, scale, rng)
+        designs = np.concatenate([designs, extra])
+        risk = np.concatenate([risk, evaluate_all(extra, wind, sun, dt, params, workers, max_mb, battery)])
+        cost = np.concatenate([cost, design_cost(extra, params)])
+        scale /= 2
+    return designs, cost, risk, pareto_front(cost, risk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost/reliability sizing sweep for the hybrid system")
+    parser.add_argument("--points", type=int, default=20, help="grid points per variable")
+    parser.add_argument("--refine", type=int, default=0, help="rounds of local search around the front")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--step", type=float, default=15, help="step length in minutes")
+    parser.add_argument("--load", type=float, default=35, help="constant load in W")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lead-acid", action="store_true", help="use hybrid_battery.LeadAcidBattery")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-mb", type=float, default=256, help="memory for one batch of designs")
+    parser.add_argument("--csv", help="write the Pareto front to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    designs, cost, risk, front = optimise(args.points, args.refine, args.days, args.step,
+                                          Params(load_w=args.load), args.seed, args.workers, args.max_mb,
+                                          LeadAcidBattery() if args.lead_acid else None)
+    elapsed = time.perf_counter() - start
+    print(f"{len(designs)} designs in {elapsed:.2f}s ({len(designs) / elapsed:,.0f} designs/s), "
+          f"{len(front)} on the Pareto front")
+    print(" rotor (m)  PV (m²)  battery (Ah)  cost ($)  loss of load (%)")
+    for i in front:
+        print(f"{designs[i, 0]:10.3f} {designs[i, 1]:8.3f} {designs[i, 2]:13.1f} {cost[i]:9.0f} {100 * risk[i]:17.3f}")
+    if args.csv:
+        with open(args.csv, "w") as out:
+            out.write("rotor_radius_m,pv_area_m2,battery_ah,cost_usd,loss_of_load\n")
+            for i in front:
+                out.write(f"{designs[i, 0]},{designs[i, 1]},{designs[i, 2]},{cost[i]},{risk[i]}\n")
+
+
+if __name__ == "__main__":
+    main()
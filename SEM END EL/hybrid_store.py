@@ -0,0 +1,302 @@
+# hybrid_store.py
+# Memory-mapped columnar result store: one .npy file per variable plus a small JSON header
+#
+#   python hybrid_store.py run runs.store --scenarios 1000 --days 365       simulate straight to disk
+#   python hybrid_store.py summary runs.store                              statistics, read a block at a time
+#   python hybrid_store.py plot runs.store --row 3 --out run3.png          one scenario, decimated
+#   python hybrid_store.py plot runs.store --out bands.png                 SOC percentile bands
+#
+# A store is a directory holding meta.json and one (scenario x time) array
+# per variable, saved as .npy so it opens with np.load(..., mmap_mode="r")
+# as well as through ResultStore. The files are allocated at full size when
+# the store is created and batches of scenarios are written into their rows
+# in place, so a run never holds more than one batch in memory, and worker
+# processes can fill disjoint rows of the same files. Readers map the files
+# and touch only the rows or time slices they ask for.
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from hybrid_battery import LeadAcidBattery
+from hybrid_ensemble import (
+    PERCENTILES, SOC_BINS, EnsembleResult, batch_rows, histogram_percentiles,
+)
+from hybrid_sim import Params, capacity_wh, short_steps, simulate, solar_profile, time_axis, wind_profile
+
+FORMAT_VERSION = 1
+
+META = "meta.json"
+
+# variable: (unit, float column?)
+VARIABLES = {
+    "p_wind": ("W", True),
+    "p_solar": ("W", True),
+    "p_net": ("W", True),
+    "soc_wh": ("Wh", True),
+    "short": ("", False),   # True where the battery could not cover the load
+}
+
+
+class ResultStore(object):
+    """A directory of preallocated, memory-mapped (rows x steps) result arrays.
+
+    store["soc_wh"] is a np.memmap; slicing it reads only what is sliced.
+    store.meta holds the header: shape, step length, dtypes, units, and
+    whatever the writer put under "attrs".
+    """
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, META)) as source:
+            self.meta = json.load(source)
+        if self.meta["format"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: store format {self.meta['format']}, expected {FORMAT_VERSION}")
+        self._arrays = {}
+
+    @classmethod
+    def create(cls, path, rows, steps, dt, dtype="<f8", variables=VARIABLES, attrs=None):
+        """Allocate a new store at `path` (which must not exist) and open it for writing."""
+        os.makedirs(path)
+        meta = {
+            "format": FORMAT_VERSION,
+            "rows": int(rows),
+            "steps": int(steps),
+            "dt": float(dt),
+            "complete": False,
+            "variables": {name: {"unit": unit, "dtype": np.dtype(dtype if is_float else bool).str}
+                          for name, (unit, is_float) in variables.items()},
+            "attrs": attrs or {},
+        }
+        for name, column in meta["variables"].items():
+            array = np.lib.format.open_memmap(os.path.join(path, name + ".npy"), mode="w+",
+                                              dtype=column["dtype"], shape=(rows, steps))
+            del array
+        _write_meta(path, meta)
+        return cls(path, "r+")
+
+    @property
+    def shape(self):
+        return self.meta["rows"], self.meta["steps"]
+
+    @property
+    def dt(self):
+        return self.meta["dt"]
+
+    @property
+    def variables(self):
+        return tuple(self.meta["variables"])
+
+    def __getitem__(self, name):
+        if name not in self._arrays:
+            if name not in self.meta["variables"]:
+                raise KeyError(name)
+            self._arrays[name] = np.load(os.path.join(self.path, name + ".npy"), mmap_mode=self.mode)
+        return self._arrays[name]
+
+    def hours(self, start=0, stop=None):
+        """Start time in hours of steps start ... stop."""
+        stop = self.meta["steps"] if stop is None else min(stop, self.meta["steps"])
+        return np.arange(start, stop) * self.dt
+
+    def write(self, start, **columns):
+        """Put (rows x steps) arrays into rows start ... start + len(array) of their variables."""
+        for name, values in columns.items():
+            self[name][start:start + len(values)] = values
+
+    def flush(self):
+        for array in self._arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def finish(self, **attrs):
+        """Flush the data and mark the store complete, adding `attrs` to the header."""
+        self.flush()
+        self.meta["complete"] = True
+        self.meta["attrs"].update(attrs)
+        _write_meta(self.path, self.meta)
+
+    def row_blocks(self, max_mb=64):
+        """(start, stop) ranges of rows such that one block of one variable fits in `max_mb`."""
+        rows, steps = self.shape
+        size = max(1, int(max_mb * 2 ** 20 // (steps * 8)))
+        return [(start, min(start + size, rows)) for start in range(0, rows, size)]
+
+
+def _write_meta(path, meta):
+    temporary = os.path.join(path, META + ".tmp")
+    with open(temporary, "w") as out:
+        json.dump(meta, out, indent=1)
+    os.replace(temporary, os.path.join(path, META))
+
+
+# --- WRITING ---
+
+def _fill_batch(job):
+    """Simulate one batch of scenarios (drawn like hybrid_ensemble.run_batch) into its rows."""
+    path, start, rows, seed, days, step_minutes, params, weather, battery = job
+    rng = np.random.default_rng(seed)
+    hours, dt = time_axis(days, step_minutes)
+    grid = np.broadcast_to(hours, (rows, len(hours)))
+    wind = wind_profile(grid, rng=rng, **weather.get("wind", {}))
+    sun = solar_profile(grid, rng=rng, **weather.get("solar", {}))
+    result = simulate(wind, sun, dt, params, battery=battery)
+    store = ResultStore(path, "r+")
+    store.write(start, p_wind=result.p_wind, p_solar=result.p_solar, p_net=result.p_net,
+                soc_wh=result.soc_wh, short=short_steps(result, dt, params, battery=battery))
+    store.flush()
+    return rows
+
+
+def run_to_store(path, scenarios=100, days=365, step_minutes=15, params=Params(), seed=42,
+                 workers=1, max_mb=256, weather=None, battery=None, dtype="<f8"):
+    """Simulate an ensemble straight into a new store at `path` and return it opened for reading.
+
+    Scenarios are the ones run_ensemble draws for the same arguments. Only
+    one batch per worker is ever in memory; `dtype` "<f4" halves the files.
+    """
+    hours, dt = time_axis(days, step_minutes)
+    steps = len(hours)
+    attrs = {"params": {name: float(value) for name, value in params._asdict().items()},
+             "capacity_wh": float(capacity_wh(params)), "seed": seed, "days": days,
+             "step_minutes": step_minutes, "weather": weather or {},
+             "battery": type(battery).__name__ if battery is not None else "IdealBattery"}
+    store = ResultStore.create(path, scenarios, steps, dt, dtype, attrs=attrs)
+
+    rows = batch_rows(steps, max_mb)
+    starts = list(range(0, scenarios, rows))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [(path, start, min(rows, scenarios - start), child, days, step_minutes, params, weather or {}, battery)
+            for start, child in zip(starts, seeds)]
+    if workers > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            for _ in pool.imap_unordered(_fill_batch, jobs):
+                pass
+    else:
+        for job in jobs:
+            _fill_batch(job)
+    store.finish()
+    return ResultStore(path)
+
+
+# --- READING ---
+
+def summarise(store, threshold=0.2, points=96, max_mb=64):
+    """An EnsembleResult for a stored run, reading one block of rows at a time."""
+    rows, steps = store.shape
+    dt = store.dt
+    capacity = store.meta["attrs"]["capacity_wh"]
+    points = min(points, steps)
+    bucket = np.arange(steps) * points // steps
+    histogram = np.zeros((points, SOC_BINS + 1), dtype=np.int64)
+    short = np.empty(rows)
+    hours_below = np.empty(rows)
+    min_soc = np.empty(rows)
+    final_soc = np.empty(rows)
+    for start, stop in store.row_blocks(max_mb):
+        percent = np.asarray(store["soc_wh"][start:stop], dtype=float) * (100.0 / capacity)
+        short[start:stop] = store["short"][start:stop].sum(axis=1)
+        hours_below[start:stop] = (percent < 100.0 * threshold).sum(axis=1) * dt
+        min_soc[start:stop] = percent.min(axis=1)
+        final_soc[start:stop] = percent[:, -1]
+        level = np.minimum((percent * (SOC_BINS / 100.0)).astype(np.int64), SOC_BINS)
+        histogram += np.bincount((bucket * (SOC_BINS + 1) + level).ravel(),
+                                 minlength=points * (SOC_BINS + 1)).reshape(points, SOC_BINS + 1)
+    hours = store.hours()
+    return EnsembleResult(
+        scenarios=rows,
+        loss_of_load=float(np.mean(short > 0)),
+        lole_fraction=float(short.sum()) / (rows * steps),
+        below_probability=float(np.mean(hours_below > 0)),
+        percentile_hours=hours[np.searchsorted(bucket, np.arange(points))],
+        soc_percentiles=histogram_percentiles(histogram),
+        hours_below=hours_below,
+        min_soc=min_soc,
+        final_soc=final_soc,
+    )
+
+
+def window(store, name, start_h=0.0, stop_h=None, rows=slice(None)):
+    """Values of one variable between two times (in hours) for the chosen rows, as an in-memory array."""
+    first = int(np.ceil(start_h / store.dt - 1e-9))
+    last = store.shape[1] if stop_h is None else int(np.ceil(stop_h / store.dt - 1e-9))
+    return np.array(store[name][rows, first:last])
+
+
+def row_series(store, row, points=2000, method="minmax"):
+    """hybrid_plot.run_series for one stored scenario, reading only that row."""
+    from hybrid_plot import decimate
+
+    hours = store.hours()
+    attrs = store.meta["attrs"]
+    p_solar = np.asarray(store["p_solar"][row], dtype=float)
+    p_wind = np.asarray(store["p_wind"][row], dtype=float)
+    soc_percent = np.asarray(store["soc_wh"][row], dtype=float) * (100.0 / attrs["capacity_wh"])
+    return {
+        "solar": decimate(hours, p_solar, points, method),
+        "wind": decimate(hours, p_wind, points, method),
+        "total": decimate(hours, p_solar + p_wind, points, method),
+        "soc": decimate(hours, soc_percent, points, method),
+        "load": attrs["params"]["load_w"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write hybrid runs to a memory-mapped store, or read one back")
+    parser.add_argument("command", choices=("run", "summary", "plot"))
+    parser.add_argument("path", help="store directory")
+    parser.add_argument("--scenarios", type=int, default=100)
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--step", type=float, default=15, help="step length in minutes")
+    parser.add_argument("--load", type=float, default=35, help="constant load in W")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lead-acid", action="store_true", help="use hybrid_battery.LeadAcidBattery")
+    parser.add_argument("--float32", action="store_true", help="store float columns as float32")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-mb", type=float, default=256, help="memory for one batch or block")
+    parser.add_argument("--threshold", type=float, default=20, help="critical SOC in %%")
+    parser.add_argument("--row", type=int, help="plot: this scenario (default: percentile bands of all)")
+    parser.add_argument("--points", type=int, default=2000, help="plot: points kept per line")
+    parser.add_argument("--out", default="hybrid_store.png", help="plot: output file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "run":
+        store = run_to_store(args.path, args.scenarios, args.days, args.step, Params(load_w=args.load),
+                             args.seed, args.workers, args.max_mb,
+                             battery=LeadAcidBattery() if args.lead_acid else None,
+                             dtype="<f4" if args.float32 else "<f8")
+        rows, steps = store.shape
+        size = sum(os.path.getsize(os.path.join(args.path, name + ".npy")) for name in store.variables)
+        print(f"{rows} x {steps} steps written to {args.path} ({size / 2 ** 20:.0f} MB) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    store = ResultStore(args.path)
+    if not store.meta["complete"]:
+        print(f"warning: {args.path} was not finished; unwritten rows are zero")
+    if args.command == "summary":
+        result = summarise(store, args.threshold / 100.0, max_mb=args.max_mb)
+        print(f"{result.scenarios} scenarios x {store.shape[1]} steps read in {time.perf_counter() - start:.2f}s")
+        print(f"Loss-of-load probability: {100 * result.loss_of_load:.2f}% of scenarios "
+              f"({100 * result.lole_fraction:.3f}% of steps)")
+        print(f"P(SOC < {args.threshold:g}%): {100 * result.below_probability:.2f}%")
+        print("Minimum SOC %, percentiles " + ", ".join(
+            f"p{p}: {s:.1f}" for p, s in zip(PERCENTILES, np.percentile(result.min_soc, PERCENTILES))))
+        return
+
+    from hybrid_plot import render, render_bands
+    if args.row is None:
+        render_bands(args.out, summarise(store, args.threshold / 100.0, max_mb=args.max_mb), args.threshold)
+    else:
+        render(args.out, row_series(store, args.row, args.points), f" (scenario {args.row})")
+    print(f"wrote {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
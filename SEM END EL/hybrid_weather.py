@@ -0,0 +1,200 @@
+# hybrid_weather.py
+# Streams measured weather files through the hybrid model in chunks
+#
+#   python hybrid_weather.py --make-sample year.csv --days 365      write a 1-minute synthetic year
+#   python hybrid_weather.py --make-sample odd.csv --sample-step 7  records every 7 minutes
+#   python hybrid_weather.py year.csv --step 15                    simulate it at 15-minute steps
+#   python hybrid_weather.py year.bin --chunk 50000
+#
+# Input is either a CSV with a header naming the columns "hours" (numeric
+# hours, or ISO timestamps), "irradiance" (W/m²) and "wind" (m/s), or a raw
+# binary file of little-endian float64 records laid out as RECORD. Only one
+# chunk of rows is in memory at a time: chunks are averaged onto the
+# simulation step as they arrive, and the battery charge at the end of one
+# chunk is the starting charge of the next.
+
+import argparse
+import csv
+import itertools
+import time
+
+import numpy as np
+
+from hybrid_sim import Params, capacity_wh, short_steps, simulate, solar_profile, time_axis, wind_profile
+
+RECORD = np.dtype([("hours", "<f8"), ("irradiance", "<f8"), ("wind", "<f8")])
+
+COLUMNS = ("hours", "irradiance", "wind")
+
+
+def read_csv_chunks(path, rows=100000):
+    """Yield (hours, irradiance, wind) arrays of up to `rows` lines each from a weather CSV."""
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip().lower() for name in next(reader)]
+        try:
+            index = [header.index(name) for name in COLUMNS]
+        except ValueError:
+            raise ValueError(f"{path}: header must name the columns {', '.join(COLUMNS)}")
+        origin = None
+        while True:
+            read = list(itertools.islice(reader, rows))
+            if not read:
+                return
+            # blank lines (often one at the end of the file) come back as []
+            lines = [line for line in read if line]
+            if not lines:
+                continue
+            stamps = [line[index[0]].strip() for line in lines]
+            try:
+                hours = np.array(stamps, dtype=float)
+            except ValueError:
+                # ISO timestamps: hours since the first one in the file
+                moments = np.array(stamps, dtype="datetime64[s]")
+                if origin is None:
+                    origin = moments[0]
+                hours = (moments - origin) / np.timedelta64(3600, "s")
+            irradiance = np.array([line[index[1]] for line in lines], dtype=float)
+            wind = np.array([line[index[2]] for line in lines], dtype=float)
+            yield hours, irradiance, wind
+
+
+def read_binary_chunks(path, rows=100000):
+    """Yield (hours, irradiance, wind) arrays of up to `rows` records each from a RECORD file."""
+    with open(path, "rb") as handle:
+        while True:
+            block = np.fromfile(handle, dtype=RECORD, count=rows)
+            if not len(block):
+                return
+            yield block["hours"], block["irradiance"], block["wind"]
+
+
+def read_chunks(path, rows=100000):
+    reader = read_csv_chunks if path.lower().endswith(".csv") else read_binary_chunks
+    return reader(path, rows)
+
+
+def resample(chunks, dt):
+    """Average (hours, irradiance, wind) chunks onto steps of `dt` hours.
+
+    Yields the same triple on the simulation grid, one chunk per input chunk.
+    The last step of each chunk stays open until data past its end arrives,
+    so a step split across two chunks is averaged over all of its samples.
+    Steps without samples hold the previous value (upsampling does the same).
+    Times must not go backwards.
+    """
+    origin = None
+    pending = None  # (step, irradiance sum, wind sum, samples) of the open step
+    last = (0.0, 0.0)
+    for hours, irradiance, wind in chunks:
+        if not len(hours):
+            continue
+        if origin is None:
+            origin = hours[0]
+        step = np.floor((hours - origin) / dt + 1e-9).astype(np.int64)
+        first = step[0] if pending is None else pending[0]
+        local = np.maximum(step - first, 0)
+        size = local[-1] + 1
+        count = np.bincount(local, minlength=size).astype(float)
+        sum_g = np.bincount(local, irradiance, size)
+        sum_w = np.bincount(local, wind, size)
+        if pending is not None:
+            sum_g[0] += pending[1]
+            sum_w[0] += pending[2]
+            count[0] += pending[3]
+        pending = (first + size - 1, sum_g[-1], sum_w[-1], count[-1])
+        if size > 1:
+            last, out = _fill(first, sum_g[:-1], sum_w[:-1], count[:-1], last, origin, dt)
+            yield out
+    if pending is not None:
+        _, out = _fill(pending[0], pending[1:2], pending[2:3], np.array(pending[3:4]), last, origin, dt)
+        yield out
+
+
+def _fill(first, sum_g, sum_w, count, last, origin, dt):
+    """Step means with empty steps holding the previous value; returns (new last, (hours, irradiance, wind))."""
+    filled = count > 0
+    safe = np.where(filled, count, 1.0)
+    # index of the most recent filled step, with position 0 standing for `last`
+    source = np.maximum.accumulate(np.where(np.concatenate(([True], filled)), np.arange(len(count) + 1), 0))
+    irradiance = np.concatenate(([last[0]], sum_g / safe))[source][1:]
+    wind = np.concatenate(([last[1]], sum_w / safe))[source][1:]
+    hours = origin + (first + np.arange(len(count))) * dt
+    return (irradiance[-1], wind[-1]), (hours, irradiance, wind)
+
+
+def simulate_stream(chunks, dt, params=Params()):
+    """Run the model over resampled chunks, carrying the battery charge between them.
+
+    Yields (hours, Result, short) per chunk, where short marks unmet-load steps.
+    """
+    soc_wh = params.initial_soc * capacity_wh(params)
+    for hours, irradiance, wind in chunks:
+        result = simulate(wind, irradiance, dt, params, initial_wh=soc_wh)
+        short = short_steps(result, dt, params, initial_wh=soc_wh)
+        soc_wh = result.soc_wh[-1]
+        yield hours, result, short
+
+
+def run_file(path, step_minutes=15, params=Params(), rows=100000):
+    """Simulate a whole weather file; returns a dict of run totals."""
+    dt = step_minutes / 60.0
+    capacity = float(capacity_wh(params))
+    totals = {"steps": 0, "wind_kwh": 0.0, "solar_kwh": 0.0, "short_hours": 0.0,
+              "min_soc": 100.0, "final_soc": 100.0 * params.initial_soc}
+    for hours, result, short in simulate_stream(resample(read_chunks(path, rows), dt), dt, params):
+        totals["steps"] += len(hours)
+        totals["wind_kwh"] += result.p_wind.sum() * dt / 1000.0
+        totals["solar_kwh"] += result.p_solar.sum() * dt / 1000.0
+        totals["short_hours"] += short.sum() * dt
+        totals["min_soc"] = min(totals["min_soc"], 100.0 * result.soc_wh.min() / capacity)
+        totals["final_soc"] = 100.0 * result.soc_wh[-1] / capacity
+    return totals
+
+
+def write_sample(path, days=365, step_minutes=1, seed=42, rows=100000):
+    """Write EL2-style synthetic weather as CSV (".csv") or RECORD binary, `rows` at a time."""
+    rng = np.random.default_rng(seed)
+    hours, _ = time_axis(days, step_minutes)
+    text = path.lower().endswith(".csv")
+    with open(path, "w" if text else "wb") as out:
+        if text:
+            out.write(",".join(COLUMNS) + "\n")
+        for start in range(0, len(hours), rows):
+            block = np.empty(min(rows, len(hours) - start), dtype=RECORD)
+            block["hours"] = hours[start:start + rows]
+            block["irradiance"] = solar_profile(block["hours"], rng=rng)
+            block["wind"] = wind_profile(block["hours"], rng=rng)
+            if text:
+                # hours at full precision, so odd step lengths read back onto the same step
+                np.savetxt(out, block.view("<f8").reshape(-1, 3), fmt=("%.17g", "%.6f", "%.6f"), delimiter=",")
+            else:
+                block.tofile(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hybrid model over a measured weather file")
+    parser.add_argument("path", help="weather CSV or RECORD binary file")
+    parser.add_argument("--step", type=float, default=15, help="simulation step in minutes")
+    parser.add_argument("--chunk", type=int, default=100000, help="rows read at a time")
+    parser.add_argument("--load", type=float, default=35, help="constant load in W")
+    parser.add_argument("--make-sample", action="store_true", help="write synthetic weather to path instead")
+    parser.add_argument("--days", type=float, default=365, help="--make-sample: length of the file")
+    parser.add_argument("--sample-step", type=float, default=1, help="--make-sample: minutes between records")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.make_sample:
+        write_sample(args.path, args.days, args.sample_step, rows=args.chunk)
+        print(f"wrote {args.path} in {time.perf_counter() - start:.2f}s")
+        return
+    totals = run_file(args.path, args.step, Params(load_w=args.load), args.chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{totals['steps']} steps of {args.step:g} min in {elapsed:.2f}s")
+    print(f"Wind {totals['wind_kwh']:.1f} kWh, solar {totals['solar_kwh']:.1f} kWh")
+    print(f"Unmet load for {totals['short_hours']:.2f} h; SOC minimum {totals['min_soc']:.2f}%, "
+          f"final {totals['final_soc']:.2f}%")
+
+
+if __name__ == "__main__":
+    main()